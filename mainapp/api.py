@@ -1,30 +1,90 @@
 import math
 import json
 import os
+import calendar
 
 from django.conf import settings
 from django.shortcuts import get_object_or_404
-from django.http import JsonResponse, FileResponse, Http404, HttpResponseBadRequest, HttpResponseServerError
+from django.http import JsonResponse, FileResponse, HttpResponse, Http404, HttpResponseBadRequest, HttpResponseRedirect, HttpResponseServerError, StreamingHttpResponse
 from django.core.paginator import Paginator, EmptyPage
-from .models import Model
-from .utils import get_kv, admin
+from django.db.models import Avg, Count, F, Prefetch, Q, Value
+from django.db.models.functions import ASin, Cos, Floor, Least, Power, Radians, Sin, Sqrt
+from django.utils.cache import get_conditional_response, set_response_etag
+from django.utils.http import http_date, quote_etag, urlsafe_base64_encode, urlsafe_base64_decode
+from .models import Model, ModelListing, ModelVariant, lod_variant_name, lod_variants
+from .utils import get_kv, admin, text_filter
+from . import storage
+from .utils.compression import ENCODINGS, choose_encoding
 from django.views.decorators.csrf import csrf_exempt
 from social_django.models import UserSocialAuth
 
 RESULTS_PER_API_CALL= 20
+MODELS_PER_INFO_CALL = 500
+MODELS_PER_NEAREST_CALL = 500
+MAX_MAP_ZOOM = 18
+MAP_CACHE_MAX_AGE = 300 # in seconds
+MODEL_CACHE_MAX_AGE = 86400 # in seconds, for the latest revision of a model
+REVISION_CACHE_MAX_AGE = 31536000 # in seconds, revisions never change
+FILE_CHUNK_SIZE = 64 * 1024 # in bytes
+MAP_CLUSTER_GRID = 8 # clusters per side of a tile
+
+# cursors are opaque to clients, they encode the last model_id of a page
+def encode_cursor(model_id):
+    return urlsafe_base64_encode(str(model_id).encode())
+
+# raises ValueError for malformed cursors. An empty cursor starts at the first page.
+def decode_cursor(cursor):
+    if not cursor:
+        return 0
+
+    if not isinstance(cursor, str):
+        raise ValueError('Invalid cursor')
 
-# returns a paginated json response
-def api_paginate(models, page_id):
-    paginator = Paginator(models, RESULTS_PER_API_CALL)
+    try:
+        return int(urlsafe_base64_decode(cursor).decode())
+    except UnicodeDecodeError:
+        raise ValueError('Invalid cursor')
+
+# returns a page of models and the cursor of the page after it.
+# Without a cursor, pages are numbered by page_id and there is no next cursor.
+# With a cursor, models are paged by model_id, which avoids the COUNT(*) and
+# OFFSET that make deep numbered pages slow.
+def paginate(models, page_id, cursor=None):
+    if cursor is None:
+        paginator = Paginator(models, RESULTS_PER_API_CALL)
+
+        try:
+            return paginator.page(page_id), None
+        except EmptyPage:
+            return [], None
+
+    models = models.filter(model_id__gt=decode_cursor(cursor)).order_by('model_id')
+
+    # fetch one more model than needed to know whether there is a next page
+    model_results = list(models[:RESULTS_PER_API_CALL + 1])
+    if len(model_results) <= RESULTS_PER_API_CALL:
+        return model_results, None
+
+    model_results = model_results[:RESULTS_PER_API_CALL]
+    return model_results, encode_cursor(model_results[-1].model_id)
+
+# returns the json response of a page of results
+def paginated_response(results, cursor, next_cursor):
+    if cursor is None:
+        return JsonResponse(results, safe=False)
 
+    return JsonResponse({'results': results, 'next': next_cursor})
+
+# returns a paginated json response
+def api_paginate(models, page_id, cursor=None):
     try:
-        model_results = paginator.page(page_id)
-    except EmptyPage:
-        model_results = []
+        model_results, next_cursor = paginate(models, page_id, cursor)
+    except ValueError:
+        return HttpResponseBadRequest('Invalid cursor')
 
     results = [model.model_id for model in model_results]
 
-    return JsonResponse(results, safe=False)
+    return paginated_response(results, cursor, next_cursor)
 
 # decorator for returning 'Access-Control-Allow-Origin' header
 def any_origin(f):
@@ -34,14 +94,35 @@ def any_origin(f):
         return response
     return request
 
-# Create your views here.
-@any_origin
-def get_info(request, model_id):
-    model = get_object_or_404(Model, latest=True, model_id=model_id)
+# returns the listings of the latest models that the user making the request can see.
+# The lookups and searches use these instead of Model, as they need no joins.
+def visible_listings(request):
+    models = ModelListing.objects.all()
 
-    if model.is_hidden and not admin(request):
-        raise Http404('Model does not exist.')
+    if not admin(request):
+        models = models.filter(is_hidden=False)
+
+    return models
+
+# returns the latest models, with everything model_info needs fetched
+# in a fixed number of queries, no matter how many models there are
+def info_queryset(request):
+    models = Model.objects.filter(latest=True, status=Model.Status.READY) \
+        .select_related('location') \
+        .prefetch_related(
+            # ordered by pk, so that the first one matches Profile.uid
+            Prefetch('author__social_auth', queryset=UserSocialAuth.objects.order_by('pk')),
+            'categories',
+            Prefetch('variants', queryset=ModelVariant.objects.order_by('name')),
+        )
+
+    if not admin(request):
+        models = models.filter(is_hidden=False)
 
+    return models
+
+# returns the info dictionary of a model fetched through info_queryset
+def model_info(model):
     if model.location:
         latitude = model.location.latitude
         longitude = model.location.longitude
@@ -49,7 +130,7 @@ def get_info(request, model_id):
         latitude = None
         longitude = None
 
-    result = {
+    return {
         'id': model.model_id,
         'revision': model.revision,
         'title': model.title,
@@ -57,39 +138,264 @@ def get_info(request, model_id):
         'lon': longitude,
         'license': model.license,
         'desc': model.description,
-        'author': model.author.profile.uid,
+        'author': model.author.social_auth.all()[0].uid,
         'date': model.upload_date,
         'rotation': model.rotation,
         'scale': model.scale,
         'translation': [model.translation_x, model.translation_y, model.translation_z],
         'tags': model.tags,
-
-        # Note: the [::1] evaluates the query set to a list
-        'categories': model.categories.all().values_list('name', flat=True)[::1],
+        'categories': [category.name for category in model.categories.all()],
+        'variants': [variant.name for variant in model.variants.all()],
+        # the triangle counts of the levels of detail, the first one being the model itself
+        'lods': [model.triangle_count] + [lod.triangle_count for lod in lod_variants(model)],
+        'stats': model.stats,
     }
 
-    return JsonResponse(result)
+# The ETag is a hash of the results, so it only changes when they do, and
+# unchanged results are answered with a 304 without sending them again.
+# Without a max_age, clients have to revalidate their copy on every use.
+def conditional_json_response(request, results, max_age=None):
+    response = JsonResponse(results, safe=False)
+
+    set_response_etag(response)
+    if max_age is None:
+        response['Cache-Control'] = 'no-cache'
+    else:
+        response['Cache-Control'] = 'max-age={}'.format(max_age)
+    response['Vary'] = 'Cookie' # hidden models are shown to admins
+
+    return get_conditional_response(request, etag=response['ETag'], response=response)
 
+# Create your views here.
 @any_origin
-def get_model(request, model_id, revision=None):
+def get_info(request, model_id):
+    model = get_object_or_404(info_queryset(request), model_id=model_id)
+
+    return conditional_json_response(request, model_info(model))
+
+@csrf_exempt # there's no need for this, since no data is modified
+@any_origin
+def get_info_batch(request):
+    body = request.body.decode('UTF-8')
+    try:
+        model_ids = json.loads(body)
+    except (ValueError, json.JSONDecodeError):
+        return HttpResponseBadRequest('Invalid JSON')
+
+    if not isinstance(model_ids, list) or \
+       not all(isinstance(model_id, int) and not isinstance(model_id, bool) for model_id in model_ids):
+        return HttpResponseBadRequest('Expected a list of model ids')
+
+    if len(model_ids) > MODELS_PER_INFO_CALL:
+        return HttpResponseBadRequest(
+            'At most {} model ids can be requested at once'.format(MODELS_PER_INFO_CALL))
+
+    models = info_queryset(request).filter(model_id__in=model_ids)
+    models = {model.model_id: model for model in models}
+
+    # keep the requested order, skipping models that don't exist or are hidden
+    results = [model_info(models[model_id]) for model_id in dict.fromkeys(model_ids) if model_id in models]
+
+    return JsonResponse(results, safe=False)
+
+# Returns the first and last byte of the range requested by a Range header, or
+# None if the whole file should be sent instead: for headers that aren't a single
+# byte range, which servers may ignore. Raises ValueError if the range doesn't
+# overlap the file.
+def parse_range(header, size):
+    unit, _, ranges = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in ranges:
+        return None
+
+    first, sep, last = (part.strip() for part in ranges.partition('-'))
+    if not sep or not (first or last) or \
+       (first and not first.isdigit()) or (last and not last.isdigit()):
+        return None
+
+    if not first:
+        # a suffix range, with the length of the end of the file to send
+        if int(last) == 0 or size == 0:
+            raise ValueError('Unsatisfiable range')
+        return max(size - int(last), 0), size - 1
+
+    if last and int(first) > int(last):
+        return None
+
+    if int(first) >= size:
+        raise ValueError('Unsatisfiable range')
+
+    return int(first), min(int(last), size - 1) if last else size - 1
+
+# yields the bytes of an open file from first to last, in chunks, and closes it
+def file_range(f, first, last):
+    with f:
+        f.seek(first)
+        remaining = last - first + 1
+        while remaining > 0:
+            chunk = f.read(min(FILE_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+# returns the given revision of a model, or its latest one, if the user making
+# the request can see it. Revisions that aren't validated yet, or failed, aren't served.
+def get_revision(request, model_id, revision=None):
+    models = Model.objects.filter(status=Model.Status.READY)
+
     if not revision:
-        model = get_object_or_404(Model, model_id=model_id, latest=True)
-        revision = model.revision
+        model = get_object_or_404(models, model_id=model_id, latest=True)
     else:
-        model = get_object_or_404(Model, model_id=model_id, revision=revision)
+        model = get_object_or_404(models, model_id=model_id, revision=revision)
 
     if model.is_hidden and not admin(request):
         raise Http404('Model does not exist.')
 
-    model_path = '{}/{}/{}.glb'.format(settings.MODEL_DIR, model_id, revision)
+    return model
 
-    if not os.path.isfile(model_path):
+# returns the Cache-Control header of the files of a model. Those of a pinned
+# revision never change, and can be cached forever.
+def file_cache_control(pinned):
+    if pinned:
+        return 'public, max-age={}, immutable'.format(REVISION_CACHE_MAX_AGE)
+
+    return 'public, max-age={}'.format(MODEL_CACHE_MAX_AGE)
+
+@any_origin
+def get_model(request, model_id, revision=None):
+    pinned = bool(revision)
+    model = get_revision(request, model_id, revision)
+    revision = model.revision
+
+    # files derived from the revision, such as its optimized variant, can be requested
+    variant_name = request.GET.get('variant')
+    lod = request.GET.get('lod')
+    if lod is not None:
+        if variant_name or not lod.isdigit():
+            return HttpResponseBadRequest('Invalid level of detail')
+        # level 0 is the revision itself
+        if int(lod) > 0:
+            variant_name = lod_variant_name(int(lod))
+
+    if variant_name:
+        variant = model.variants.filter(name=variant_name).first()
+        if variant is None:
+            raise Http404('Variant does not exist.')
+        file_hash = variant.file_hash
+        download_name = '{}_{}_{}.glb'.format(model_id, revision, variant.name)
+    else:
+        file_hash = model.file_hash
+        download_name = '{}_{}.glb'.format(model_id, revision)
+
+    if not file_hash:
         return HttpResponseServerError('Model file not found on the server')
-    
-    response = FileResponse(open(model_path, 'rb'))
-    response['Content-Disposition'] = 'attachment; filename={}_{}.glb'.format(model_id, revision)
+
+    if settings.MODEL_SERVING == 'redirect':
+        # the client downloads the file from the storage itself. Presigned URLs expire,
+        # so the redirect is not cached, and the storage answers for missing files.
+        response = HttpResponseRedirect(storage.blob_url(file_hash))
+        response['Cache-Control'] = 'no-store'
+        return response
+
+    if not storage.blob_exists(file_hash):
+        return HttpResponseServerError('Model file not found on the server')
+
+    # revision files never change, so the hash of their contents is a strong ETag,
+    # and a pinned revision can be cached forever
+    headers = {
+        'ETag': quote_etag(file_hash),
+        'Cache-Control': file_cache_control(pinned),
+    }
+    last_modified = None
+    if pinned:
+        # the latest revision changes with new uploads, so it is only validated by its ETag
+        last_modified = calendar.timegm(model.upload_date.timetuple())
+        headers['Last-Modified'] = http_date(last_modified)
+
+    # the proxies answer Range requests themselves when sending the file
+    headers['Accept-Ranges'] = 'bytes'
+
+    proxied = settings.MODEL_SERVING in ('x-accel-redirect', 'x-sendfile')
+    range_header = request.headers.get('Range')
+
+    # a precompressed variant is sent if the client accepts it. Ranges are always
+    # of the file itself, and the proxies pick the variants themselves.
+    encoding = None
+    if not proxied:
+        headers['Vary'] = 'Accept-Encoding'
+        if not range_header:
+            encoding = choose_encoding(request.headers.get('Accept-Encoding', ''),
+                                       storage.blob_name(file_hash), storage.model_storage().exists)
+    if encoding:
+        # each variant is a different representation, with its own ETag
+        headers['ETag'] = quote_etag('{}-{}'.format(file_hash, encoding))
+        headers['Content-Encoding'] = encoding
+
+    # answered before the file is opened
+    not_modified = get_conditional_response(
+        request, etag=headers['ETag'], last_modified=last_modified)
+    if not_modified is not None:
+        for header, value in headers.items():
+            not_modified[header] = value
+        return not_modified
+
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    # with an If-Range, the range is only sent if the client's copy is still current
+    if not proxied and range_header and \
+       (not if_range or if_range in (headers['ETag'], headers.get('Last-Modified'))):
+        size = storage.blob_size(file_hash)
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = 'bytes */{}'.format(size)
+            for header, value in headers.items():
+                response[header] = value
+            return response
+
+    if settings.MODEL_SERVING == 'x-accel-redirect':
+        # nginx sends the file, the application only checks access to it
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = '{}/{}'.format(
+            settings.MODEL_ACCEL_REDIRECT_LOCATION, storage.blob_name(file_hash))
+    elif settings.MODEL_SERVING == 'x-sendfile':
+        response = HttpResponse()
+        response['X-Sendfile'] = os.path.abspath(storage.blob_path(file_hash))
+    elif byte_range:
+        first, last = byte_range
+        response = StreamingHttpResponse(file_range(storage.open_blob(file_hash), first, last), status=206)
+        response['Content-Length'] = last - first + 1
+        response['Content-Range'] = 'bytes {}-{}/{}'.format(first, last, size)
+        response['Access-Control-Expose-Headers'] = 'Content-Range'
+    elif encoding:
+        response = FileResponse(storage.open_blob(file_hash, suffix=ENCODINGS[encoding]))
+    else:
+        response = FileResponse(storage.open_blob(file_hash))
+
+    response['Content-Disposition'] = 'attachment; filename={}'.format(download_name)
     response['Content-Type'] = 'model/gltf-binary'
-    response['Cache-Control'] = 'public, max-age=86400'
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+@any_origin
+def get_thumbnail(request, model_id, revision=None):
+    model = get_revision(request, model_id, revision)
+
+    if not model.thumbnail_hash:
+        raise Http404('Thumbnail does not exist.')
+
+    if not storage.blob_exists(model.thumbnail_hash, 'png'):
+        return HttpResponseServerError('Thumbnail file not found on the server')
+
+    etag = quote_etag(model.thumbnail_hash)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = FileResponse(storage.open_blob(model.thumbnail_hash, 'png'), content_type='image/png')
+
+    response['ETag'] = etag
+    response['Cache-Control'] = file_cache_control(bool(revision))
     return response
 
 @any_origin
@@ -98,42 +404,50 @@ def lookup_tag(request, tag, page_id=1):
         key, value = get_kv(tag)
     except ValueError:
         return HttpResponseBadRequest('Invalid tag format.')
-    models = Model.objects.filter(latest=True, tags__contains={key: value}).order_by('model_id')
-
-    if not admin(request):
-        models = models.filter(is_hidden=False)
+    models = visible_listings(request).filter(tags__contains={key: value}).order_by('model_id')
 
-    return api_paginate(models, page_id)
+    return api_paginate(models, page_id, request.GET.get('cursor'))
 
 @any_origin
 def lookup_category(request, category, page_id=1):
-    models = Model.objects.filter(latest=True, categories__name=category)
-
-    if not admin(request):
-        models = models.filter(is_hidden=False)
+    models = visible_listings(request).filter(categories__contains=[category])
 
-    return api_paginate(models, page_id)
+    return api_paginate(models, page_id, request.GET.get('cursor'))
 
 @any_origin
 def lookup_author(request, uid, page_id=1):
-    user = get_object_or_404(UserSocialAuth, uid=uid).user
-    models = user.model_set.filter(latest=True)
+    get_object_or_404(UserSocialAuth, uid=uid)
+    models = visible_listings(request).filter(author_uid=uid)
 
-    if not admin(request):
-        models = models.filter(is_hidden=False)
+    return api_paginate(models, page_id, request.GET.get('cursor'))
+
+PLANETARY_RADIUS = 6371e3 # in meters
 
-    return api_paginate(models, page_id)
+# returns an expression of the great-circle distance in meters between a
+# listing's location and the given point, using the haversine formula
+def distance_to(latitude, longitude):
+    d_latitude = Radians(F('latitude') - latitude)
+    d_longitude = Radians(F('longitude') - longitude)
 
+    haversine = Power(Sin(d_latitude / 2), 2) + \
+        math.cos(math.radians(latitude)) * Cos(Radians(F('latitude'))) * \
+        Power(Sin(d_longitude / 2), 2)
+
+    # rounding errors can push the haversine slightly above 1, outside the domain of asin
+    return 2 * PLANETARY_RADIUS * ASin(Sqrt(Least(haversine, Value(1.0))))
+
+# filters the listings within distance meters of a point, annotating them with that distance.
+# The bounding box of the circle is filtered first, so that the index on the
+# location can be used, and then trimmed to the actual circle.
 def range_filter(models, latitude, longitude, distance):
     # bind latitude and longitude from [min, max] to [-pi, pi] for usage in trigonometry
-    latitude = math.radians(latitude)
-    longitude = math.radians(longitude)
+    latitude_rad = math.radians(latitude)
+    longitude_rad = math.radians(longitude)
 
-    PLANETARY_RADIUS = 6371e3 # in meters
     angular_radius = distance / PLANETARY_RADIUS
 
-    min_latitude = latitude - angular_radius
-    max_latitude = latitude + angular_radius
+    min_latitude = latitude_rad - angular_radius
+    max_latitude = latitude_rad + angular_radius
 
     MIN_LATITUDE = -math.pi/2
     MAX_LATITUDE = math.pi/2
@@ -141,13 +455,13 @@ def range_filter(models, latitude, longitude, distance):
     MAX_LONGITUDE = math.pi
 
     if min_latitude > MIN_LATITUDE and max_latitude < MAX_LATITUDE:
-        d_longitude = math.asin(math.sin(angular_radius)/math.cos(latitude))
+        d_longitude = math.asin(math.sin(angular_radius)/math.cos(latitude_rad))
 
-        min_longitude = longitude - d_longitude
+        min_longitude = longitude_rad - d_longitude
         if min_longitude < MIN_LONGITUDE:
             min_longitude += 2 * math.pi
 
-        max_longitude = longitude + d_longitude
+        max_longitude = longitude_rad + d_longitude
         if max_longitude > MAX_LONGITUDE:
             max_longitude -= 2 * math.pi
     else:
@@ -162,11 +476,22 @@ def range_filter(models, latitude, longitude, distance):
     min_longitude = math.degrees(min_longitude)
     max_longitude = math.degrees(max_longitude)
 
-    return models.filter(
-            location__latitude__gte=min_latitude,
-            location__latitude__lte=max_latitude,
-            location__longitude__gte=min_longitude,
-            location__longitude__lte=max_longitude)
+    models = models.filter(
+            latitude__gte=min_latitude,
+            latitude__lte=max_latitude)
+
+    if min_longitude <= max_longitude:
+        models = models.filter(
+            longitude__gte=min_longitude,
+            longitude__lte=max_longitude)
+    else:
+        # the box crosses the antimeridian
+        models = models.filter(
+            Q(longitude__gte=min_longitude) |
+            Q(longitude__lte=max_longitude))
+
+    return models.annotate(distance=distance_to(latitude, longitude)) \
+        .filter(distance__lte=distance)
 
 @any_origin
 def search_range(request, latitude, longitude, distance, page_id=1):
@@ -174,23 +499,113 @@ def search_range(request, latitude, longitude, distance, page_id=1):
     longitude = float(longitude)
     distance = float(distance)
 
-    models = Model.objects.filter(latest=True)
+    models = range_filter(visible_listings(request), latitude, longitude, distance)
 
-    if not admin(request):
-        models = models.filter(is_hidden=False)
+    return api_paginate(models, page_id, request.GET.get('cursor'))
+
+@any_origin
+def search_nearest(request, latitude, longitude, count):
+    latitude = float(latitude)
+    longitude = float(longitude)
+    count = int(count)
+
+    if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        return HttpResponseBadRequest('Invalid coordinates')
+
+    if not 0 < count <= MODELS_PER_NEAREST_CALL:
+        return HttpResponseBadRequest(
+            'Between 1 and {} models can be requested at once'.format(MODELS_PER_NEAREST_CALL))
+
+    models = visible_listings(request)
+
+    # Search in growing circles until one holds enough models. Every model outside
+    # a circle is further away than every model inside it, so the nearest models in
+    # the circle are the nearest models overall. Each search uses the location index.
+    MAX_DISTANCE = math.pi * PLANETARY_RADIUS # half the circumference, covers the whole planet
+    distance = 1000
+    while True:
+        results = range_filter(models, latitude, longitude, distance) \
+            .order_by('distance', 'model_id') \
+            .values_list('model_id', 'distance')[:count]
+        results = [list(result) for result in results]
 
-    models = range_filter(models, latitude, longitude, distance)
+        if len(results) == count or distance >= MAX_DISTANCE:
+            break
 
-    return api_paginate(models, page_id)
+        distance = min(distance * 4, MAX_DISTANCE)
+
+    return JsonResponse(results, safe=False)
+
+# returns the (south, west, north, east) bounds of a slippy map tile, in degrees
+def tile_bounds(zoom, x, y):
+    tiles = 2 ** zoom
+
+    def latitude(y):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / tiles))))
+
+    def longitude(x):
+        return x / tiles * 360 - 180
+
+    return latitude(y + 1), longitude(x), latitude(y), longitude(x + 1)
+
+# returns the listings located in a slippy map tile, or None if the tile doesn't exist
+def tile_models(request, zoom, x, y):
+    if zoom > MAX_MAP_ZOOM or x >= 2 ** zoom or y >= 2 ** zoom:
+        return None
+
+    south, west, north, east = tile_bounds(zoom, x, y)
+
+    return visible_listings(request).filter(
+        latitude__gte=south,
+        latitude__lt=north,
+        longitude__gte=west,
+        longitude__lt=east)
 
 @any_origin
-def search_title(request, title, page_id=1):
-    models = Model.objects.filter(latest=True, title__icontains=title)
+def map_tile(request, zoom, x, y):
+    models = tile_models(request, int(zoom), int(x), int(y))
 
-    if not admin(request):
-        models = models.filter(is_hidden=False)
+    if models is None:
+        return HttpResponseBadRequest('Invalid tile')
 
-    return api_paginate(models, page_id)
+    results = models.order_by('model_id') \
+        .values_list('model_id', 'title', 'latitude', 'longitude')
+
+    return conditional_json_response(request, [list(result) for result in results], MAP_CACHE_MAX_AGE)
+
+@any_origin
+def map_clusters(request, zoom, x, y):
+    zoom = int(zoom)
+    x = int(x)
+    y = int(y)
+
+    models = tile_models(request, zoom, x, y)
+
+    if models is None:
+        return HttpResponseBadRequest('Invalid tile')
+
+    # Group the models into a grid of cells over the tile, in the database, so that
+    # the number of clusters per tile is capped no matter how many models there are
+    south, west, north, east = tile_bounds(zoom, x, y)
+    results = models \
+        .annotate(
+            cell_x=Floor((F('longitude') - west) / (east - west) * MAP_CLUSTER_GRID),
+            cell_y=Floor((north - F('latitude')) / (north - south) * MAP_CLUSTER_GRID)) \
+        .values('cell_x', 'cell_y') \
+        .annotate(
+            cluster_latitude=Avg('latitude'),
+            cluster_longitude=Avg('longitude'),
+            count=Count('pk')) \
+        .order_by('cell_y', 'cell_x') \
+        .values_list('cluster_latitude', 'cluster_longitude', 'count')
+
+    return conditional_json_response(request, [list(result) for result in results], MAP_CACHE_MAX_AGE)
+
+@any_origin
+def search_title(request, title, page_id=1):
+    models = text_filter(visible_listings(request), title, title_only=True).order_by('-rank', 'model_id')
+
+    return api_paginate(models, page_id, request.GET.get('cursor'))
 
 @csrf_exempt # there's no need for this, since no data is modified
 @any_origin
@@ -201,18 +616,14 @@ def search_full(request):
     except (ValueError, json.JSONDecodeError):
         return HttpResponseBadRequest('Invalid JSON')
 
-    models = Model.objects.filter(latest=True)
-
-    if not admin(request):
-        models = models.filter(is_hidden=False)
+    models = visible_listings(request)
 
     if data.get('author'): #uid
-        try:
-            author = UserSocialAuth.objects.get(uid=data.get('author')).user
-            models = models.filter(author=author)
-        except UserSocialAuth.DoesNotExist:
+        if not UserSocialAuth.objects.filter(uid=data.get('author')).exists():
             return HttpResponseBadRequest('Author not found')
 
+        models = models.filter(author_uid=data.get('author'))
+
     latitude = data.get('lat')
     longitude = data.get('lon')
     distance = data.get('range')
@@ -223,33 +634,47 @@ def search_full(request):
 
     title = data.get('title')
     if title:
-        models = models.filter(title__icontains=title)
+        models = text_filter(models, title, title_only=True)
 
     tags = data.get('tags')
     if tags:
-        for key, value in tags.items():
-            models = models.filter(tags__contains={key:value})
+        if not isinstance(tags, dict):
+            return HttpResponseBadRequest('Invalid tags')
+
+        # a single containment check for all tags, which the tags index supports
+        models = models.filter(tags__contains=tags)
 
     categories = data.get('categories')
     if categories:
-        for category in categories:
-            models = models.filter(categories__name=category)
+        if not isinstance(categories, list) or \
+           not all(isinstance(category, str) for category in categories):
+            return HttpResponseBadRequest('Invalid categories')
+
+        # a single array containment check for all categories, which the categories index supports
+        models = models.filter(categories__contains=categories)
+
+    max_faces = data.get('max_faces')
+    if max_faces is not None:
+        if not isinstance(max_faces, int) or isinstance(max_faces, bool):
+            return HttpResponseBadRequest('Invalid max_faces')
+
+        # models whose faces couldn't be counted are left out
+        models = models.filter(stats__faces__lte=max_faces)
 
     models = models.order_by('model_id')
 
     page_id = int(data.get('page', 1))
+    cursor = data.get('cursor')
 
     fmt = data.get('format')
 
     if not fmt:
-        return api_paginate(models, page_id)
-
-    paginator = Paginator(models, RESULTS_PER_API_CALL)
+        return api_paginate(models, page_id, cursor)
 
     try:
-        model_results = paginator.page(page_id)
-    except EmptyPage:
-        model_results = []
+        model_results, next_cursor = paginate(models, page_id, cursor)
+    except ValueError:
+        return HttpResponseBadRequest('Invalid cursor')
 
     def result(model):
         output = []
@@ -258,17 +683,15 @@ def search_full(request):
             if string == 'id':
                 output.append(model.model_id)
             elif string == 'latitude':
-                try:
-                    output.append(model.location.latitude)
-                except:
-                    output.append(None)
+                output.append(model.latitude)
             elif string == 'longitude':
-                try:
-                    output.append(model.location.longitude)
-                except:
-                    output.append(None)
+                output.append(model.longitude)
             elif string == 'title':
                 output.append(model.title)
+            elif string == 'lods':
+                output.append(model.lod_triangles)
+            elif string == 'stats':
+                output.append(model.stats)
             else:
                 raise Exception()
 
@@ -279,4 +702,4 @@ def search_full(request):
     except:
         return HttpResponseBadRequest('Invalid format specifier')
 
-    return JsonResponse(results, safe=False)
+    return paginated_response(results, cursor, next_cursor)
@@ -3,18 +3,28 @@ import logging
 import shutil
 
 from django.db import transaction
+from django.db.models import Max
 from django.conf import settings
 from django.contrib import messages
 
-from .models import Model, Change, Category, Location
+from .models import Model, ModelVariant, IngestJob, Change, Category, Location, lod_variant_name
+from . import storage
 
 from mainapp.markdown import markdown
+from mainapp.utils import hash_file
+from mainapp.utils.gltf import glb_stats, glb_triangle_count
+from mainapp.utils.model_processing import run_model_command
 
 logger = logging.getLogger(__name__)
 
 def upload(model_file, options={}):
     try:
         with transaction.atomic():
+            # Uploads processed asynchronously are pending until validated by the ingest
+            # workers, and only then become the latest revision, see mainapp.ingest
+            ingest_async = settings.MODEL_INGEST == 'async'
+            status = Model.Status.PENDING if ingest_async else Model.Status.READY
+
             if options.get('revision', False):
                 m = Model.objects.get(model_id=options['model_id'], latest=True)
 
@@ -29,10 +39,16 @@ def upload(model_file, options={}):
 
                 m.pk = None
                 m.id = None
-                m.revision += 1
+                # after the revisions still pending too
+                m.revision = Model.objects.filter(model_id=m.model_id) \
+                    .aggregate(Max('revision'))['revision__max'] + 1
                 m.author = options['author']
                 m.location = location
-                m.latest = True
+                m.latest = not ingest_async
+                m.status = status
+                m.processing_errors = []
+                # rendered from the file of the previous revision
+                m.thumbnail_hash = None
                 m._state.adding = True
                 m.save()
                 m.categories.set(categories)
@@ -69,7 +85,8 @@ def upload(model_file, options={}):
                     license=options['license'],
                     author=options['author'],
                     source=options['source'],
-                    latest=True
+                    latest=not ingest_async,
+                    status=status,
                 )
 
                 m.save()
@@ -86,13 +103,22 @@ def upload(model_file, options={}):
 
             change.save()
 
-            filepath = '{}/{}/{}.glb'.format(settings.MODEL_DIR, m.model_id, m.revision)
-            os.makedirs(os.path.dirname(filepath), exist_ok=True)
-            with open(filepath, 'wb+') as destination:
-                for chunk in model_file.chunks():
-                    destination.write(chunk)
-
-            return m
+            if getattr(model_file, 'sha256', None):
+                # written to the staging directory and hashed while it was uploaded
+                staged_path, m.file_hash = model_file.temporary_file_path(), model_file.sha256
+            else:
+                staged_path, m.file_hash = storage.stage_chunks(model_file.chunks())
+            # read once, rather than by every client showing them
+            m.stats = glb_stats(staged_path)
+            m.triangle_count = m.stats['faces'] if m.stats else None
+            m.save(update_fields=['file_hash', 'triangle_count', 'stats'])
+
+            # renamed into place, and identical files are only stored once
+            storage.commit_blob(staged_path, m.file_hash)
+
+            if ingest_async:
+                # validated and processed by the ingest workers, see mainapp.ingest
+                IngestJob.objects.create(model=m)
     except:
         # We reach here when any of the following happens:
         # 1) Database constraint is violated
@@ -109,6 +135,16 @@ def upload(model_file, options={}):
 
         return None
 
+    # outside of the transaction, as the processing tools can take a while. The
+    # revision is saved by now, so failing to process it doesn't fail the upload.
+    if not ingest_async:
+        try:
+            process_model(m)
+        except Exception:
+            logger.exception(f'Failed to process model {m.model_id}, revision {m.revision}.')
+
+    return m
+
 # Edits the metadata of a model, returns True when successful, and False otherwise
 def edit(options):
     try:
@@ -148,6 +184,8 @@ def edit(options):
             elif m.location:
                 location = m.location
                 m.location = None
+                # unlink the location before deleting it, as the deletion cascades to the model
+                m.save()
                 location.delete()
 
             m.save()
@@ -158,6 +196,114 @@ def edit(options):
 
         return False
 
+# Writes the files derived from a model revision. Failures are logged, as the
+# model itself is still served, and the missing files can be written later.
+def process_model(m):
+    # the derived files of an identical file that was processed before are shared
+    twin = Model.objects.filter(file_hash=m.file_hash).exclude(pk=m.pk) \
+        .prefetch_related('variants').order_by('pk').first()
+
+    if twin is None:
+        try:
+            storage.compress_blob(m.file_hash)
+        except OSError:
+            logger.exception('Failed to write the compressed variants of a model.')
+        twin_variants = {}
+    else:
+        twin_variants = {variant.name: variant for variant in twin.variants.all()}
+
+    for name, command, placeholders in configured_variants():
+        if name in twin_variants:
+            twin_variant = twin_variants[name]
+            ModelVariant.objects.update_or_create(model=m, name=name, defaults={
+                'file_hash': twin_variant.file_hash,
+                'size': twin_variant.size,
+                'triangle_count': twin_variant.triangle_count,
+            })
+        else:
+            make_variant(m, name, command, **placeholders)
+
+    if settings.MODEL_THUMBNAILER:
+        if twin is not None and twin.thumbnail_hash:
+            m.thumbnail_hash = twin.thumbnail_hash
+            m.save(update_fields=['thumbnail_hash'])
+        else:
+            make_thumbnail(m)
+
+# Returns the name, command line and extra placeholders of each variant
+# that the configured processing tools make
+def configured_variants():
+    variants = []
+
+    if settings.MODEL_OPTIMIZER:
+        variants.append(('optimized', settings.MODEL_OPTIMIZER, {}))
+
+    if settings.MODEL_SIMPLIFIER:
+        for lod, ratio in enumerate(settings.MODEL_LOD_RATIOS, 1):
+            variants.append((lod_variant_name(lod), settings.MODEL_SIMPLIFIER, {'ratio': ratio}))
+
+    return variants
+
+# Writes a variant of a model revision with a processing command, and records it.
+# Returns the variant, or None if the command failed.
+def make_variant(m, name, command, **placeholders):
+    variant_path = storage.staging_path()
+
+    with storage.local_blob(m.file_hash) as model_path:
+        succeeded = run_model_command(command, input=model_path, output=variant_path, **placeholders)
+
+    if not succeeded:
+        logger.error(f'Failed to make the {name} variant of model {m.model_id}, revision {m.revision}.')
+        if os.path.isfile(variant_path):
+            os.remove(variant_path)
+        return None
+
+    size = os.path.getsize(variant_path)
+    triangle_count = glb_triangle_count(variant_path)
+    file_hash = hash_file(variant_path)
+    if storage.commit_blob(variant_path, file_hash):
+        try:
+            storage.compress_blob(file_hash)
+        except OSError:
+            logger.exception('Failed to write the compressed variants of a model.')
+
+    previous = ModelVariant.objects.filter(model=m, name=name).values_list('file_hash', flat=True).first()
+    variant, _ = ModelVariant.objects.update_or_create(
+        model=m,
+        name=name,
+        defaults={
+            'file_hash': file_hash,
+            'size': size,
+            'triangle_count': triangle_count,
+        },
+    )
+    if previous != file_hash:
+        storage.release_blob(previous)
+
+    return variant
+
+# Renders the thumbnail of a model revision, and records it.
+# Returns True if it was rendered.
+def make_thumbnail(m):
+    thumbnail_path = storage.staging_path('png')
+
+    with storage.local_blob(m.file_hash) as model_path:
+        succeeded = run_model_command(settings.MODEL_THUMBNAILER, input=model_path, output=thumbnail_path)
+
+    if not succeeded:
+        logger.error(f'Failed to render the thumbnail of model {m.model_id}, revision {m.revision}.')
+        if os.path.isfile(thumbnail_path):
+            os.remove(thumbnail_path)
+        return False
+
+    previous = m.thumbnail_hash
+    m.thumbnail_hash = storage.store_staged(thumbnail_path, 'png')
+    m.save(update_fields=['thumbnail_hash'])
+    if previous != m.thumbnail_hash:
+        storage.release_blob(previous, 'png')
+
+    return True
+
 def delete(model_id, revision=None):
     try:
         with transaction.atomic():
@@ -171,10 +317,13 @@ def delete(model_id, revision=None):
                 return False
 
             for m in models:
-                path = '{}/{}/{}.glb'.format(settings.MODEL_DIR, m.model_id, revision)
-                if os.path.isfile(path):
-                    os.remove(path)
+                blobs = [(m.file_hash, 'glb'), (m.thumbnail_hash, 'png')] + \
+                    [(variant.file_hash, 'glb') for variant in m.variants.all()]
                 m.delete()
+
+                # the files are kept while other revisions share them
+                for file_hash, extension in blobs:
+                    storage.release_blob(file_hash, extension)
             
             logger.info('Model deleted successfully.')
             return True
@@ -1,6 +1,6 @@
 from django import forms
 from django.conf import settings
-from .utils import get_kv, LICENSES_FORM, validate_glb_file
+from .utils import get_kv, LICENSES_FORM, check_glb_file, validate_glb_file
 
 class TagField(forms.CharField):
     def __init__(self, *args, **kwargs):
@@ -112,6 +112,11 @@ class ModelField(forms.FileField):
                 code='file_too_large'
             )
 
+        if settings.MODEL_INGEST == 'async':
+            # validated later by the ingest workers, see mainapp.ingest
+            check_glb_file(model)
+            return
+
         errors = validate_glb_file(model)
         if errors:
             self.glb_errors = errors
@@ -0,0 +1,127 @@
+import time
+import logging
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import database, storage
+from .models import IngestJob, Model
+from .utils.model_validator import INTERNAL_ERROR, validate_glb_path
+
+logger = logging.getLogger(__name__)
+
+# Uploads are validated and processed by a pool of workers when MODEL_INGEST is 'async'.
+# The queue is the IngestJob table: workers lease the oldest job that no other worker
+# holds, skipping the rows locked by the others, and delete it once done.
+
+# Jobs failing this many times with unexpected errors are given up, and their revision failed
+MAX_ATTEMPTS = 3
+
+# Leases the oldest available job, returns it, or None if there is none
+def claim_job():
+    now = timezone.now()
+
+    with transaction.atomic():
+        job = IngestJob.objects.select_for_update(skip_locked=True, of=('self',)) \
+            .filter(Q(locked_until=None) | Q(locked_until__lt=now)) \
+            .select_related('model').order_by('created').first()
+
+        if job is None:
+            return None
+
+        job.attempts += 1
+        job.locked_until = now + timedelta(seconds=settings.INGEST_LEASE)
+        job.save(update_fields=['attempts', 'locked_until'])
+
+    return job
+
+# Returns the validation errors of a revision, or None if it is valid.
+# Internal errors, such as a missing validator, are raised.
+def validate(m):
+    try:
+        with storage.local_blob(m.file_hash) as model_path:
+            return validate_glb_path(model_path, m.file_hash)
+    except ValidationError as e:
+        if e.code == INTERNAL_ERROR:
+            raise
+        return [{'message': message, 'pointer': 'N/A'} for message in e.messages]
+
+def fail(m, errors):
+    m.status = Model.Status.FAILED
+    m.processing_errors = errors
+    m.save(update_fields=['status', 'processing_errors'])
+
+# Marks a validated revision ready, and makes it the latest one unless a newer
+# revision became ready first. Failed revisions leave the latest one as it is.
+def publish(m):
+    m.status = Model.Status.READY
+    m.latest = not Model.objects.filter(
+        model_id=m.model_id, revision__gt=m.revision, status=Model.Status.READY).exists()
+    m.save(update_fields=['status', 'latest'])
+
+# Validates and processes the revision of a job, and removes the job
+def run_job(job):
+    m = job.model
+
+    try:
+        errors = validate(m)
+        if errors:
+            fail(m, errors)
+        else:
+            database.process_model(m)
+            publish(m)
+        job.delete()
+    except Exception:
+        logger.exception(f'Failed to process model {m.model_id}, revision {m.revision}.')
+
+        if job.attempts >= MAX_ATTEMPTS:
+            fail(m, [{'message': 'Internal server error.', 'pointer': 'N/A'}])
+            job.delete()
+        else:
+            # released to be taken again right away
+            job.locked_until = None
+            job.save(update_fields=['locked_until'])
+
+# Runs jobs until the queue is empty if once is set, or forever otherwise
+def run_worker(once=False):
+    while True:
+        if not once:
+            # like after a request, as long-running workers outlive their connections
+            close_old_connections()
+
+        job = claim_job()
+        if job is None:
+            if once:
+                return
+            time.sleep(settings.INGEST_POLL_INTERVAL)
+            continue
+
+        try:
+            run_job(job)
+        except Exception:
+            # such as the revision being deleted while it was processed
+            logger.exception('Failed to record the result of an ingest job.')
+
+def run_thread_worker(once):
+    try:
+        run_worker(once)
+    finally:
+        # the connections of threads are not closed by Django
+        connection.close()
+
+# Runs a pool of workers, the calling thread being the only worker when there is one
+def work(workers=None, once=False):
+    workers = workers or settings.INGEST_WORKERS
+
+    if workers == 1:
+        run_worker(once)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in [executor.submit(run_thread_worker, once) for _ in range(workers)]:
+            future.result()
@@ -0,0 +1,44 @@
+import logging
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+from mainapp import storage
+from mainapp.models import Model, ValidationReport
+from mainapp.utils.model_validator import validation_report
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Validates the stored model files whose validation report is not cached, so that uploading them again skips gltf-validator'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Validate every model file again, such as after updating gltf-validator'
+        )
+
+    def handle(self, *args, **options):
+        if options['force']:
+            ValidationReport.objects.all().delete()
+
+        # identical files are stored once, in the same blob
+        file_hashes = set(Model.objects.exclude(file_hash=None).values_list('file_hash', flat=True))
+        file_hashes.difference_update(ValidationReport.objects.values_list('file_hash', flat=True))
+
+        validated = 0
+        for file_hash in sorted(file_hashes):
+            if not storage.blob_exists(file_hash):
+                logger.error(f"model file {file_hash} not found at: {storage.blob_name(file_hash)}.")
+                continue
+
+            try:
+                with storage.local_blob(file_hash) as model_path:
+                    validation_report(model_path, file_hash)
+            except ValidationError as e:
+                logger.error(f"Failed to validate model file {file_hash}: {e.messages[0]}")
+                continue
+
+            validated += 1
+
+        self.stdout.write('Cached the validation reports of {} model files.'.format(validated))
@@ -0,0 +1,40 @@
+import logging
+
+from django.core.management.base import BaseCommand
+from mainapp import storage
+from mainapp.models import Model, ModelVariant
+from mainapp.utils.compression import ENCODINGS, available_encodings
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Writes the precompressed variants of the model files that are missing them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rewrite the variants of every model file'
+        )
+
+    def handle(self, *args, **options):
+        compressed = 0
+
+        # identical files are stored once, in the same blob
+        file_hashes = set(Model.objects.exclude(file_hash=None).values_list('file_hash', flat=True))
+        file_hashes.update(ModelVariant.objects.values_list('file_hash', flat=True))
+
+        for file_hash in sorted(file_hashes):
+            if not storage.blob_exists(file_hash):
+                logger.error(f"model file {file_hash} not found at: {storage.blob_name(file_hash)}.")
+                continue
+
+            # variants that weren't worth keeping are tried again too
+            if not options['force'] and all(
+                    storage.blob_exists(file_hash, suffix=ENCODINGS[encoding]) for encoding in available_encodings()):
+                continue
+
+            storage.compress_blob(file_hash)
+            compressed += 1
+
+        self.stdout.write('Compressed {} model files.'.format(compressed))
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from mainapp import ingest
+
+class Command(BaseCommand):
+    help = 'Validates and processes the uploaded models waiting in the ingest queue, when MODEL_INGEST is async'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.INGEST_WORKERS,
+            help='Number of models processed at the same time'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once the queue is empty, instead of waiting for new uploads'
+        )
+
+    def handle(self, *args, **options):
+        ingest.work(workers=options['workers'], once=options['once'])
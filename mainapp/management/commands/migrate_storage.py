@@ -0,0 +1,49 @@
+import os
+import logging
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from mainapp import storage
+from mainapp.models import Model
+from mainapp.utils import hash_file
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Moves the model files from MODEL_DIR/<model_id>/<revision>.glb into the content-addressed blob store of the model storage'
+
+    def handle(self, *args, **options):
+        moved = 0
+        directories = set()
+
+        for model in Model.objects.prefetch_related('variants').iterator(chunk_size=100):
+            directory = os.path.join(settings.MODEL_DIR, str(model.model_id))
+            directories.add(directory)
+
+            model_path = os.path.join(directory, '{}.glb'.format(model.revision))
+            if os.path.isfile(model_path):
+                file_hash = hash_file(model_path)
+                if model.file_hash != file_hash:
+                    model.file_hash = file_hash
+                    model.save(update_fields=['file_hash'])
+                storage.commit_blob(model_path, file_hash)
+                moved += 1
+            elif not model.file_hash or not storage.blob_exists(model.file_hash):
+                logger.error(f"model_id: {model.model_id}, revision {model.revision}'s model file not found at: {model_path}.")
+
+            # the hashes of the derived files were recorded when they were made
+            for variant in model.variants.all():
+                variant_path = os.path.join(directory, '{}.{}.glb'.format(model.revision, variant.name))
+                if os.path.isfile(variant_path):
+                    storage.commit_blob(variant_path, variant.file_hash)
+
+            thumbnail_path = os.path.join(directory, '{}.thumbnail.png'.format(model.revision))
+            if model.thumbnail_hash and os.path.isfile(thumbnail_path):
+                storage.commit_blob(thumbnail_path, model.thumbnail_hash, 'png')
+
+        # the directories of the models are left in place if anything else is in them
+        for directory in directories:
+            if os.path.isdir(directory) and not os.listdir(directory):
+                os.rmdir(directory)
+
+        self.stdout.write('Moved {} model files.'.format(moved))
@@ -1,9 +1,8 @@
-import os
 import logging
 
-from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
 from django.utils.dateformat import format
+from mainapp import storage
 from mainapp.models import Model
 from json import dumps
 from zipfile import ZipFile
@@ -59,14 +58,13 @@ class Command(BaseCommand):
                 ]
             })
 
-            model_path = '{}/{}/{}.glb'.format(settings.MODEL_DIR, model_id, model.revision)
-
-            if not os.path.isfile(model_path):
-                logging.error(f"model_id: {model_id}, {model.title}'s model file not found at: {model_path}.")
+            if not model.file_hash or not storage.blob_exists(model.file_hash):
+                logging.error(f"model_id: {model_id}, {model.title}'s model file {model.file_hash} not found.")
                 continue
 
             info_file.write('"{}": {}\n'.format(model_id, output))
-            zip_file.write(model_path, 'models/{}.glb'.format(model_id))
+            with storage.local_blob(model.file_hash) as model_path:
+                zip_file.write(model_path, 'models/{}.glb'.format(model_id))
 
         info_file.write('}')
         info_file.close()
@@ -0,0 +1,47 @@
+import logging
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from mainapp import database
+from mainapp import storage
+from mainapp.models import Model
+from mainapp.utils.gltf import glb_stats
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Reads the statistics, and makes the variants and thumbnails, of the model revisions that are missing them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Remake the variants and thumbnails of every model revision'
+        )
+
+    def handle(self, *args, **options):
+        variants = database.configured_variants()
+        processed = 0
+
+        for model in Model.objects.prefetch_related('variants').iterator(chunk_size=100):
+            if not model.file_hash or not storage.blob_exists(model.file_hash):
+                logger.error(f"model_id: {model.model_id}, revision {model.revision}'s model file {model.file_hash} not found.")
+                continue
+
+            if model.triangle_count is None or model.stats is None:
+                with storage.local_blob(model.file_hash) as model_path:
+                    model.stats = glb_stats(model_path)
+                model.triangle_count = model.stats['faces'] if model.stats else None
+                model.save(update_fields=['triangle_count', 'stats'])
+
+            existing = {variant.name for variant in model.variants.all()}
+            for name, command, placeholders in variants:
+                if options['force'] or name not in existing:
+                    if database.make_variant(model, name, command, **placeholders):
+                        processed += 1
+
+            if settings.MODEL_THUMBNAILER and (options['force'] or not model.thumbnail_hash):
+                if database.make_thumbnail(model):
+                    processed += 1
+
+        self.stdout.write('Made {} model variants and thumbnails.'.format(processed))
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:54
+
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mainapp', '0009_model_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='model',
+            index=django.contrib.postgres.indexes.GinIndex(condition=models.Q(('latest', True)), fields=['tags'], name='model_latest_tags_idx', opclasses=['jsonb_path_ops']),
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations
+from django.db.models import Count
+
+def merge_duplicate_categories(apps, schema_editor):
+    """
+    Merges categories with the same name into the oldest of them,
+    so that category names can be made unique.
+    """
+
+    db_alias = schema_editor.connection.alias
+    Category = apps.get_model("mainapp", "Category")
+    duplicate_names = Category.objects.using(db_alias).values('name') \
+        .annotate(count=Count('id')).filter(count__gt=1).values_list('name', flat=True)
+
+    for name in duplicate_names:
+        kept, *duplicates = Category.objects.using(db_alias).filter(name=name).order_by('id')
+
+        for duplicate in duplicates:
+            kept.model_set.add(*duplicate.model_set.all())
+            duplicate.delete()
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mainapp', '0010_model_latest_tags_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_categories, migrations.RunPython.noop),
+    ]
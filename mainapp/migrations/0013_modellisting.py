@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:56
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mainapp', '0012_category_unique_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelListing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_id', models.IntegerField(unique=True)),
+                ('title', models.CharField(max_length=32)),
+                ('latitude', models.FloatField(null=True)),
+                ('longitude', models.FloatField(null=True)),
+                ('author_uid', models.CharField(max_length=255, null=True)),
+                ('categories', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=256), default=list, size=None)),
+                ('tags', models.JSONField(default=dict)),
+                ('is_hidden', models.BooleanField(default=False)),
+                ('search_vector', models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.SearchVector('title', config='simple', weight='A'), output_field=django.contrib.postgres.search.SearchVectorField())),
+                ('latest_revision', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='listing', to='mainapp.model')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['latitude', 'longitude'], name='listing_lat_lon_idx'), models.Index(fields=['author_uid'], name='listing_author_uid_idx'), django.contrib.postgres.indexes.GinIndex(fields=['tags'], name='listing_tags_idx', opclasses=['jsonb_path_ops']), django.contrib.postgres.indexes.GinIndex(fields=['categories'], name='listing_categories_idx'), django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='listing_search_vector_idx')],
+            },
+        ),
+    ]
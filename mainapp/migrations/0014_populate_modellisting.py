@@ -0,0 +1,46 @@
+from django.db import migrations
+
+def populate_model_listing(apps, schema_editor):
+    """
+    Creates the listing of the latest revision of every existing model.
+    """
+
+    db_alias = schema_editor.connection.alias
+    Model = apps.get_model("mainapp", "Model")
+    ModelListing = apps.get_model("mainapp", "ModelListing")
+    UserSocialAuth = apps.get_model("social_django", "UserSocialAuth")
+
+    latest_models = Model.objects.using(db_alias).filter(latest=True) \
+        .select_related('location').prefetch_related('categories')
+
+    for latest in latest_models.iterator(chunk_size=1000):
+        social_auth = UserSocialAuth.objects.using(db_alias) \
+            .filter(user_id=latest.author_id).order_by('pk').first()
+
+        ModelListing.objects.using(db_alias).create(
+            latest_revision=latest,
+            model_id=latest.model_id,
+            title=latest.title,
+            latitude=latest.location.latitude if latest.location else None,
+            longitude=latest.location.longitude if latest.location else None,
+            author_uid=social_auth.uid if social_auth else None,
+            categories=[category.name for category in latest.categories.all()],
+            tags=latest.tags,
+            is_hidden=latest.is_hidden,
+        )
+
+def delete_model_listing(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
+    ModelListing = apps.get_model("mainapp", "ModelListing")
+    ModelListing.objects.using(db_alias).all().delete()
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mainapp', '0013_modellisting'),
+        ('social_django', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_model_listing, delete_model_listing),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mainapp', '0014_populate_modellisting'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='model',
+            name='file_hash',
+            field=models.CharField(default=None, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mainapp', '0015_model_file_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelVariant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=32)),
+                ('file_hash', models.CharField(max_length=64)),
+                ('size', models.BigIntegerField()),
+                ('model', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='variants', to='mainapp.model')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('model', 'name'), name='unique_variant_per_model')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:15
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mainapp', '0016_modelvariant'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='model',
+            name='triangle_count',
+            field=models.IntegerField(default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='modellisting',
+            name='lod_triangles',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(null=True), default=list, size=None),
+        ),
+        migrations.AddField(
+            model_name='modelvariant',
+            name='triangle_count',
+            field=models.IntegerField(default=None, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mainapp', '0017_lod_triangle_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='model',
+            name='thumbnail_hash',
+            field=models.CharField(default=None, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mainapp', '0018_model_thumbnail_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='model',
+            name='processing_errors',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name='model',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', max_length=16),
+        ),
+        migrations.CreateModel(
+            name='IngestJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('attempts', models.IntegerField(default=0)),
+                ('locked_until', models.DateTimeField(default=None, null=True)),
+                ('model', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='ingest_job', to='mainapp.model')),
+            ],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mainapp', '0019_ingest_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ValidationReport',
+            fields=[
+                ('file_hash', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('report', models.JSONField()),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mainapp', '0020_validation_report'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='model',
+            name='stats',
+            field=models.JSONField(default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='modellisting',
+            name='stats',
+            field=models.JSONField(default=None, null=True),
+        ),
+    ]
@@ -1,9 +1,12 @@
 import re
 
 from django.db import models, transaction
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.contrib.auth.models import User
 from django.contrib.staticfiles.storage import staticfiles_storage
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 
 from .utils import CHANGES
@@ -51,13 +54,26 @@ def save_user_profile(sender, instance, **kwargs):
     instance.profile.save()
 
 class Category(models.Model):
-    name = models.CharField(max_length=256)
+    name = models.CharField(max_length=256, unique=True)
 
 class Location(models.Model):
     latitude = models.FloatField()
     longitude = models.FloatField()
 
+    class Meta:
+        # used by the bounding box of range searches
+        indexes = [
+            models.Index(fields=['latitude', 'longitude'], name='location_lat_lon_idx'),
+        ]
+
 class Model(models.Model):
+    # the processing states of a revision, which is pending while it waits for
+    # the ingest workers when uploads are processed asynchronously
+    class Status(models.TextChoices):
+        PENDING = 'pending'
+        READY = 'ready'
+        FAILED = 'failed'
+
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     model_id = models.IntegerField()
     revision = models.IntegerField()
@@ -77,6 +93,24 @@ class Model(models.Model):
     translation_z = models.FloatField(null=True, default=None)
     is_hidden = models.BooleanField(default=False)
     latest = models.BooleanField(default=False)
+    # SHA-256 of the model file, in hex
+    file_hash = models.CharField(max_length=64, null=True, default=None)
+    triangle_count = models.IntegerField(null=True, default=None)
+    # the statistics of the model file shown on its page, see mainapp.utils.gltf.glb_stats
+    stats = models.JSONField(null=True, default=None)
+    # SHA-256 of the thumbnail, in hex, or None if the model has none
+    thumbnail_hash = models.CharField(max_length=64, null=True, default=None)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.READY)
+    # the validation errors of a failed revision, with their 'message' and 'pointer'
+    processing_errors = models.JSONField(default=list)
+
+    # kept up to date by the database, titles are weighted A and descriptions B
+    search_vector = models.GeneratedField(
+        expression=SearchVector('title', weight='A', config='simple') + \
+            SearchVector('description', weight='B', config='simple'),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     @property
     def source_is_url(self):
@@ -86,6 +120,18 @@ class Model(models.Model):
     class Meta:
         unique_together = ('model_id', 'revision',)
 
+        indexes = [
+            GinIndex(fields=['search_vector'], name='model_search_vector_idx'),
+            # only supports containment (@>), which is how tags are looked up.
+            # Tag lookups always filter for the latest revisions.
+            GinIndex(
+                fields=['tags'],
+                opclasses=['jsonb_path_ops'],
+                condition=models.Q(latest=True),
+                name='model_latest_tags_idx',
+            ),
+        ]
+
         # UniqueConstraint automatically creates an Index expression
         constraints = [
             models.UniqueConstraint(
@@ -109,16 +155,141 @@ class Model(models.Model):
         with transaction.atomic():
             if self.latest:
                 latest_model = Model.objects.filter(
-                    model_id=self.model_id
+                    model_id=self.model_id,
+                    status=Model.Status.READY
                 ).exclude(pk=self.pk).order_by('-revision').first()
 
-                # if self is not the last standing revision of the model
+                # if self is not the last standing ready revision of the model
                 # assign the next revision as latest
                 if latest_model:
                     latest_model.latest=True
                     latest_model.save()
             return super().delete(*args, **kwargs)
 
+# A read-optimized copy of the latest revision of every model, with its location,
+# author and categories inline, so that the API can look models up without joins.
+# It is kept in sync with Model by the signal receivers below.
+class ModelListing(models.Model):
+    latest_revision = models.OneToOneField(Model, on_delete=models.CASCADE, related_name='listing')
+    model_id = models.IntegerField(unique=True)
+    title = models.CharField(max_length=32)
+    latitude = models.FloatField(null=True)
+    longitude = models.FloatField(null=True)
+    author_uid = models.CharField(max_length=255, null=True)
+    categories = ArrayField(models.CharField(max_length=256), default=list)
+    tags = models.JSONField(default=dict)
+    is_hidden = models.BooleanField(default=False)
+    # the triangle counts of the levels of detail, the first one being the model itself
+    lod_triangles = ArrayField(models.IntegerField(null=True), default=list)
+    stats = models.JSONField(null=True, default=None)
+
+    # the title is weighted A, like in Model.search_vector
+    search_vector = models.GeneratedField(
+        expression=SearchVector('title', weight='A', config='simple'),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['latitude', 'longitude'], name='listing_lat_lon_idx'),
+            models.Index(fields=['author_uid'], name='listing_author_uid_idx'),
+            GinIndex(fields=['tags'], opclasses=['jsonb_path_ops'], name='listing_tags_idx'),
+            GinIndex(fields=['categories'], name='listing_categories_idx'),
+            GinIndex(fields=['search_vector'], name='listing_search_vector_idx'),
+        ]
+
+# Brings the listing of a model_id up to date with its latest revision
+def refresh_listing(model_id):
+    latest = Model.objects.filter(model_id=model_id, latest=True) \
+        .select_related('location').first()
+
+    if latest is None:
+        ModelListing.objects.filter(model_id=model_id).delete()
+        return
+
+    social_auth = latest.author.social_auth.order_by('pk').first()
+
+    ModelListing.objects.update_or_create(model_id=model_id, defaults={
+        'latest_revision': latest,
+        'title': latest.title,
+        'latitude': latest.location.latitude if latest.location else None,
+        'longitude': latest.location.longitude if latest.location else None,
+        'author_uid': social_auth.uid if social_auth else None,
+        'categories': list(latest.categories.values_list('name', flat=True)),
+        'tags': latest.tags,
+        'is_hidden': latest.is_hidden,
+        'lod_triangles': [latest.triangle_count] + [
+            lod.triangle_count for lod in lod_variants(latest)
+        ],
+        'stats': latest.stats,
+    })
+
+@receiver(post_save, sender=Model)
+@receiver(post_delete, sender=Model)
+def update_model_listing(sender, instance, **kwargs):
+    refresh_listing(instance.model_id)
+
+@receiver(m2m_changed, sender=Model.categories.through)
+def update_model_listing_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        refresh_listing(instance.model_id)
+    elif pk_set:
+        # the categories of models were changed from the category side
+        for model_id in Model.objects.filter(pk__in=pk_set).values_list('model_id', flat=True):
+            refresh_listing(model_id)
+
+# A file derived from a model revision after its upload, such as its optimized variant
+class ModelVariant(models.Model):
+    model = models.ForeignKey(Model, on_delete=models.CASCADE, related_name='variants')
+    name = models.CharField(max_length=32)
+    # SHA-256 of the variant file, in hex
+    file_hash = models.CharField(max_length=64)
+    size = models.BigIntegerField()
+    triangle_count = models.IntegerField(null=True, default=None)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['model', 'name'], name='unique_variant_per_model'),
+        ]
+
+# The name of the variant of a level of detail, counted from 1 as 0 is the model itself
+def lod_variant_name(lod):
+    return 'lod{}'.format(lod)
+
+# Returns the level of detail variants of a model revision, from the most detailed,
+# out of its variants if they were prefetched
+def lod_variants(model):
+    lods = {variant.name: variant for variant in model.variants.all()}
+    result = []
+    while lod_variant_name(len(result) + 1) in lods:
+        result.append(lods[lod_variant_name(len(result) + 1)])
+    return result
+
+@receiver(post_save, sender=ModelVariant)
+@receiver(post_delete, sender=ModelVariant)
+def update_model_listing_lods(sender, instance, **kwargs):
+    refresh_listing(instance.model.model_id)
+
+# A model revision waiting to be validated and processed by the ingest workers,
+# see mainapp.ingest. A job is leased by a worker until locked_until, and is
+# deleted once done, or taken again once the lease expires.
+class IngestJob(models.Model):
+    model = models.OneToOneField(Model, on_delete=models.CASCADE, related_name='ingest_job')
+    created = models.DateTimeField(auto_now_add=True)
+    attempts = models.IntegerField(default=0)
+    locked_until = models.DateTimeField(null=True, default=None)
+
+# The report of gltf-validator for a model file, by the SHA-256 hash of its contents,
+# reused when the same file is uploaded or processed again, see mainapp.utils.model_validator
+class ValidationReport(models.Model):
+    file_hash = models.CharField(max_length=64, primary_key=True)
+    report = models.JSONField()
+    created = models.DateTimeField(auto_now_add=True)
+
 class Change(models.Model):
     author = models.ForeignKey(User, models.CASCADE)
     model = models.ForeignKey(Model, models.CASCADE)
@@ -1,60 +1,120 @@
 var map;
 
-function rangeSearch(latitude, longitude, range, callback, page) {
+// Pins are loaded per tile, at most at this zoom level, so that zooming in
+// doesn't split the already loaded area into many more requests
+var MAX_DATA_ZOOM = 12;
+
+// Below this zoom level, clusters of models are shown instead of pins
+var MIN_PIN_ZOOM = 8;
+
+function tileSearch(url, zoom, x, y, callback) {
 	var xhr = new XMLHttpRequest();
 	xhr.addEventListener("load", function() {
-		callback(JSON.parse(xhr.responseText));
+		if(xhr.status == 200)
+			callback(JSON.parse(xhr.responseText));
 	});
 
-	xhr.open("POST", "/api/search/full");
+	xhr.open("GET", url + zoom + "/" + x + "/" + y);
+	xhr.send();
+}
+
+// returns the [x, y] of the tiles covering the map at the given zoom level
+function visibleTiles(zoom) {
+	var tiles = Math.pow(2, zoom);
 
-	var requestBody = 
-		'{' +
-		'"lat":' + latitude + ',' +
-		'"lon":' + longitude + ',' +
-		'"range":' + range + ',' +
-		'"page":' + page + ',' +
-		'"format": ["id", "title", "latitude", "longitude"]' +
-		'}';
+	var bounds = map.getBounds();
+	var topLeft = map.project(bounds.getNorthWest(), zoom).divideBy(256).floor();
+	var bottomRight = map.project(bounds.getSouthEast(), zoom).divideBy(256).floor();
+
+	var result = [];
+	for(var x = topLeft.x; x <= bottomRight.x; x++) {
+		for(var y = Math.max(topLeft.y, 0); y <= Math.min(bottomRight.y, tiles - 1); y++) {
+			// wrap around the antimeridian
+			result.push([((x % tiles) + tiles) % tiles, y]);
+		}
+	}
 
-	xhr.send(requestBody);
+	return result;
 }
 
+var pins;
 var model_ids = new Set();
-var page = 1;
-function queryModels(response) {
-	if(typeof response !== 'undefined') {
-		if(response.length == 0)
-			return;
-		else for(var i in response) {
-			var model = response[i];
-			var model_id = model[0];
-
-			if(model_ids.has(model_id))
-				continue;
-
-			var title = model[1];
-			var latitude = model[2];
-			var longitude = model[3];
-
-			addPin({
-				id: model_id,
-				title: title,
-				lat: latitude,
-				lon: longitude
-			});
-		}
+var loaded_tiles = new Set();
+function addPins(response) {
+	for(var i in response) {
+		var model = response[i];
+		var model_id = model[0];
+
+		if(model_ids.has(model_id))
+			continue;
+
+		addPin({
+			id: model_id,
+			title: model[1],
+			lat: model[2],
+			lon: model[3]
+		});
 	}
+}
 
-	var center = map.getCenter();
+var clusters;
+var cluster_zoom;
+var loaded_cluster_tiles = new Set();
+function addClusters(response) {
+	for(var i in response) {
+		var cluster = response[i];
+		var latlng = L.latLng(cluster[0], cluster[1]);
+
+		L.marker(latlng, {
+			icon: L.divIcon({
+				className: 'map-cluster',
+				html: '<span>' + cluster[2] + '</span>',
+				iconSize: [36, 36]
+			})
+		}).on('click', function(event) {
+			map.setView(event.latlng, map.getZoom() + 2);
+		}).addTo(clusters);
+	}
+}
 
-	var bounds = map.getBounds();
-	var corner = bounds.getNorthEast();
+function queryModels() {
+	var zoom = map.getZoom();
 
-	var distance = map.distance(center, corner);
+	if(zoom < MIN_PIN_ZOOM) {
+		map.removeLayer(pins);
+		map.addLayer(clusters);
 
-	rangeSearch(center.lat, center.lng, distance, queryModels, page);
-	page++;
+		// clusters are only valid for the zoom level they were made for
+		if(zoom != cluster_zoom) {
+			clusters.clearLayers();
+			loaded_cluster_tiles.clear();
+			cluster_zoom = zoom;
+		}
+
+		visibleTiles(zoom).forEach(function(tile) {
+			var key = tile[0] + "/" + tile[1];
+			if(loaded_cluster_tiles.has(key))
+				return;
+			loaded_cluster_tiles.add(key);
+
+			tileSearch("/api/map/clusters/", zoom, tile[0], tile[1], addClusters);
+		});
+
+		return;
+	}
+
+	map.removeLayer(clusters);
+	map.addLayer(pins);
+
+	zoom = Math.min(zoom, MAX_DATA_ZOOM);
+	visibleTiles(zoom).forEach(function(tile) {
+		var key = zoom + "/" + tile[0] + "/" + tile[1];
+		if(loaded_tiles.has(key))
+			return;
+		loaded_tiles.add(key);
+
+		tileSearch("/api/map/", zoom, tile[0], tile[1], addPins);
+	});
 }
 
 function addPin(model) {
@@ -63,7 +123,7 @@ function addPin(model) {
 
 	L.marker([latitude, longitude])
 		.bindPopup('<a href="/model/' + model["id"] + '">' + model["title"] + '</a>')
-		.addTo(map);
+		.addTo(pins);
 
 	model_ids.add(model["id"]);
 }
@@ -82,6 +142,9 @@ function initMap(id, latitude, longitude, width, height) {
 
 	map.setView([latitude, longitude]);
 
+	pins = L.layerGroup();
+	clusters = L.layerGroup();
+
 	L.tileLayer("https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png", {
 		attribution: 'Map data © <a href="http://openstreetmap.org">OpenStreetMap</a> contributors',
 		minZoom: 3,
@@ -89,9 +152,7 @@ function initMap(id, latitude, longitude, width, height) {
 	}).addTo(map);
 
 	map.on("moveend", function() {
-		page = 1;
 		queryModels();
-
 	});
 
 	queryModels();
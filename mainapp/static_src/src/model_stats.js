@@ -15,14 +15,16 @@ function setUpStats() {
 
 function initTHREE(fileURL) {
     const loader = new GLTFLoader();
+    let fileSize = 0;
 
     loader.load(
         fileURL,
         function (gltf) {
             document.getElementById("model-status").style.display = "none";
-            processModel(gltf);
+            processModel(gltf, fileSize);
         },
         function (progress) {
+            fileSize = progress.total || progress.loaded;
             const percent = progress.total > 0
                 ? (progress.loaded / progress.total * 100).toFixed(1)
                 : "0";
@@ -39,8 +41,9 @@ function initTHREE(fileURL) {
     );
 }
 
-function processModel(gltf) {
+function processModel(gltf, fileSize) {
     const stats = calculateModelStats(gltf.scene, gltf.animations);
+    stats.size = fileSize;
     updateModelStats(stats);
 }
 
@@ -121,6 +124,7 @@ function calculateModelStats(model, animations) {
             height: size.y.toFixed(2),
             depth: size.z.toFixed(2)
         },
+        materials: seenMaterials.size,
         hasTextures: Boolean(seenPBRTextures.size + seenOtherTextures.size),
         PBRTextureCount: seenPBRTextures.size,
         meshes: meshCount,
@@ -128,6 +132,20 @@ function calculateModelStats(model, animations) {
     };
 }
 
+// like the filesizeformat filter of Django, used when the stats are rendered by the server
+function formatFileSize(size) {
+    if (size < 1024) {
+        return `${size} bytes`;
+    }
+    const units = ["KB", "MB", "GB"];
+    let unit = -1;
+    do {
+        size /= 1024;
+        unit++;
+    } while (size >= 1024 && unit < units.length - 1);
+    return `${size.toFixed(1)}\u00a0${units[unit]}`;
+}
+
 function setStatQualityClass(id, quality) {
     const el = document.getElementById(id);
     if (!el) return;
@@ -185,6 +203,9 @@ function updateModelStats(stats) {
     );
 
     document.getElementById("hasAnimations").textContent = stats.hasAnimations ? "Yes" : "No";
+
+    document.getElementById("materialCount").textContent = stats.materials.toLocaleString("en-US");
+    document.getElementById("fileSize").textContent = stats.size ? formatFileSize(stats.size) : "-";
 }
 
 window.initStatsTHREE = initTHREE;
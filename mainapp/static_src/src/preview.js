@@ -21,6 +21,15 @@ function setUpRenderPane(){
 		const revision = elem.dataset.revision;
 		const url = "/api/model/" + model_id + "/" + revision;
 
+		// panes with a thumbnail only load the model when clicked
+		if (elem.dataset.thumbnail) {
+			elem.addEventListener('click', function() {
+				elem.replaceChildren();
+				displayPreview(elem.id, url, {}, model_id, revision,);
+			}, { once: true });
+			continue;
+		}
+
 		displayPreview(elem.id, url, {}, model_id, revision,);
 	}
 }
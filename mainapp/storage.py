@@ -0,0 +1,185 @@
+import os
+import uuid
+import shutil
+import hashlib
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, storages
+from django.db import transaction
+
+from .models import Model, ModelVariant
+from .utils import hash_file
+from .utils.compression import ENCODINGS, compress_model
+
+# Model files, and the files derived from them, are stored in the 'models' storage
+# of settings.STORAGES as blobs named after the SHA-256 of their contents, so
+# identical files are only stored once:
+#   blobs/<hash[0:2]>/<hash[2:4]>/<hash>.<extension>
+# next to their precompressed variants, <hash>.<extension>.gz and .br.
+# Files are written to the staging directory in MODEL_DIR first, and stored once complete.
+BLOB_DIR = 'blobs'
+STAGING_DIR = 'staging'
+STORAGE_ALIAS = 'models'
+
+CONTENT_TYPES = {
+    'glb': 'model/gltf-binary',
+    'png': 'image/png',
+}
+
+# The default storage of the blobs, in MODEL_DIR
+class ModelFileSystemStorage(FileSystemStorage):
+    # read when used rather than when the storage is made, so MODEL_DIR can be changed in tests
+    @property
+    def base_location(self):
+        return self._value_or_setting(self._location, settings.MODEL_DIR)
+
+    @property
+    def location(self):
+        return os.path.abspath(self.base_location)
+
+def model_storage():
+    return storages[STORAGE_ALIAS]
+
+# Checks whether the blobs are files on a local filesystem, which can be renamed
+# into place, read where they are and sent by a proxy
+def is_local():
+    return isinstance(model_storage(), FileSystemStorage)
+
+# Returns the name of a blob in the storage
+def blob_name(file_hash, extension='glb'):
+    return '{}/{}/{}/{}.{}'.format(BLOB_DIR, file_hash[:2], file_hash[2:4], file_hash, extension)
+
+# Returns the path of a blob, only for local storages
+def blob_path(file_hash, extension='glb'):
+    return model_storage().path(blob_name(file_hash, extension))
+
+def blob_exists(file_hash, extension='glb', suffix=''):
+    return model_storage().exists(blob_name(file_hash, extension) + suffix)
+
+def blob_size(file_hash, extension='glb', suffix=''):
+    return model_storage().size(blob_name(file_hash, extension) + suffix)
+
+def open_blob(file_hash, extension='glb', suffix=''):
+    return model_storage().open(blob_name(file_hash, extension) + suffix, 'rb')
+
+# Returns the URL a blob can be downloaded from, presigned for object stores
+def blob_url(file_hash, extension='glb'):
+    return model_storage().url(blob_name(file_hash, extension))
+
+# Returns a new path in the staging directory, for a file that doesn't exist yet.
+# The extension is kept, as tools often pick the format of a file from it.
+def staging_path(extension='glb'):
+    directory = os.path.join(settings.MODEL_DIR, STAGING_DIR)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, '{}.{}'.format(uuid.uuid4().hex, extension))
+
+# Writes chunks to a staging file, returns its path and the SHA-256 of its contents
+def stage_chunks(chunks, extension='glb'):
+    path = staging_path(extension)
+    file_hash = hashlib.sha256()
+
+    with open(path, 'wb') as destination:
+        for chunk in chunks:
+            destination.write(chunk)
+            file_hash.update(chunk)
+
+    return path, file_hash.hexdigest()
+
+# Moves a local file into the storage under a name, streaming it to remote storages
+def store_file(path, name, extension):
+    storage = model_storage()
+
+    if is_local():
+        destination = storage.path(name)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        os.replace(path, destination)
+        return
+
+    with open(path, 'rb') as f:
+        content = File(f)
+        content.content_type = CONTENT_TYPES.get(extension)
+        storage.save(name, content)
+    os.remove(path)
+
+# Moves a staging file, and the precompressed variants next to it, into its blob.
+# Files that are already stored are removed instead. Returns True if the blob is new.
+def commit_blob(path, file_hash, extension='glb'):
+    name = blob_name(file_hash, extension)
+    new = False
+
+    for suffix in [''] + list(ENCODINGS.values()):
+        if not os.path.isfile(path + suffix):
+            continue
+
+        if model_storage().exists(name + suffix):
+            os.remove(path + suffix)
+        else:
+            store_file(path + suffix, name + suffix, extension)
+            if not suffix:
+                new = True
+
+    return new
+
+# Stores a staging file as a blob, returns the SHA-256 of its contents
+def store_staged(path, extension='glb'):
+    file_hash = hash_file(path)
+    commit_blob(path, file_hash, extension)
+    return file_hash
+
+# Gives the path of a local copy of a blob, for the tools that only read files.
+# Blobs of remote storages are downloaded to the staging directory, and removed afterwards.
+@contextmanager
+def local_blob(file_hash, extension='glb'):
+    if is_local():
+        yield blob_path(file_hash, extension)
+        return
+
+    path = staging_path(extension)
+    try:
+        with open_blob(file_hash, extension) as source, open(path, 'wb') as destination:
+            shutil.copyfileobj(source, destination)
+        yield path
+    finally:
+        if os.path.isfile(path):
+            os.remove(path)
+
+# Writes the precompressed variants of a blob, replacing or removing the existing ones
+def compress_blob(file_hash, extension='glb'):
+    if is_local():
+        compress_model(blob_path(file_hash, extension))
+        return
+
+    name = blob_name(file_hash, extension)
+    with local_blob(file_hash, extension) as path:
+        compress_model(path)
+
+        for suffix in ENCODINGS.values():
+            model_storage().delete(name + suffix)
+            if os.path.isfile(path + suffix):
+                store_file(path + suffix, name + suffix, extension)
+
+# Checks whether a revision, one of its variants or thumbnails is stored in a blob
+def blob_in_use(file_hash, extension='glb'):
+    if extension == 'png':
+        return Model.objects.filter(thumbnail_hash=file_hash).exists()
+
+    return Model.objects.filter(file_hash=file_hash).exists() or \
+        ModelVariant.objects.filter(file_hash=file_hash).exists()
+
+# Deletes a blob and its precompressed variants once the current transaction commits,
+# unless it is still in use then, so that rows restored by a rollback keep their files.
+# Outside of a transaction, it is deleted right away.
+def release_blob(file_hash, extension='glb'):
+    if file_hash:
+        transaction.on_commit(lambda: delete_unused_blob(file_hash, extension))
+
+def delete_unused_blob(file_hash, extension):
+    if blob_in_use(file_hash, extension):
+        return
+
+    name = blob_name(file_hash, extension)
+    for name in [name] + [name + suffix for suffix in ENCODINGS.values()]:
+        # deleting a missing file is not an error for the storages
+        model_storage().delete(name)
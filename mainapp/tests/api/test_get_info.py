@@ -1,9 +1,13 @@
+import json
 from datetime import datetime
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils.timezone import make_aware
 
+from mainapp.api import MODELS_PER_INFO_CALL
 from mainapp.models import Model
 from mainapp.tests.mixins import BaseViewTestMixin
 
@@ -43,6 +47,9 @@ class GetInfoAPIViewTest(BaseViewTestMixin, TestCase):
         )
         self.assertEqual(data["tags"], self.model1.tags)
         self.assertIn(self.cat1.name, data["categories"])
+        self.assertEqual(data["variants"], [])
+        self.assertEqual(data["lods"], [self.model1.triangle_count])
+        self.assertEqual(data["stats"], self.model1.stats)
 
     def test_get_info_hidden_model_non_admin(self):
         response = self.client.get(
@@ -62,3 +69,73 @@ class GetInfoAPIViewTest(BaseViewTestMixin, TestCase):
     def test_get_info_not_found(self):
         response = self.client.get(reverse("get_info", args=[9999]))
         self.assertEqual(response.status_code, 404)
+
+    def test_get_info_not_modified(self):
+        response = self.client.get(reverse("get_info", args=[self.model1.model_id]))
+        self.assertEqual(response["Cache-Control"], "no-cache")
+        etag = response["ETag"]
+
+        response = self.client.get(
+            reverse("get_info", args=[self.model1.model_id]), HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 304)
+
+        self.model1.title = "Changed title"
+        self.model1.save()
+        response = self.client.get(
+            reverse("get_info", args=[self.model1.model_id]), HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+class GetInfoBatchAPIViewTest(BaseViewTestMixin, TestCase):
+    """
+    Tests for the get_info_batch API view in the mainapp.
+    """
+
+    def post_ids(self, model_ids):
+        return self.client.post(
+            reverse("get_info_batch"),
+            data=json.dumps(model_ids),
+            content_type="application/json",
+        )
+
+    def test_get_info_batch_success(self):
+        response = self.post_ids([self.model3.model_id, self.model1.model_id])
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+
+        self.assertEqual([info["id"] for info in data], [self.model3.model_id, self.model1.model_id])
+        self.assertEqual(
+            data[1],
+            self.client.get(reverse("get_info", args=[self.model1.model_id])).json(),
+        )
+
+    def test_get_info_batch_skips_hidden_and_missing(self):
+        response = self.post_ids([self.model1.model_id, self.model2.model_id, 9999])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([info["id"] for info in response.json()], [self.model1.model_id])
+
+    def test_get_info_batch_hidden_admin(self):
+        self.login_user(user_type="admin")
+        response = self.post_ids([self.model2.model_id])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([info["id"] for info in response.json()], [self.model2.model_id])
+
+    def test_get_info_batch_constant_queries(self):
+        with CaptureQueriesContext(connection) as single:
+            self.post_ids([self.model1.model_id])
+        with CaptureQueriesContext(connection) as multiple:
+            self.post_ids([self.model1.model_id, self.model3.model_id])
+        self.assertEqual(len(single), len(multiple))
+
+    def test_get_info_batch_invalid_body_400(self):
+        response = self.client.post(
+            reverse("get_info_batch"), data="not json", content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+        self.assertEqual(self.post_ids({"id": 1}).status_code, 400)
+        self.assertEqual(self.post_ids(["1"]).status_code, 400)
+        self.assertEqual(self.post_ids(list(range(MODELS_PER_INFO_CALL + 1))).status_code, 400)
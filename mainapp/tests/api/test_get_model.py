@@ -1,9 +1,14 @@
+import gzip
+import hashlib
 import os
 from django.conf import settings
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from mainapp.models import Model
+from mainapp import storage
+from mainapp.models import Model, ModelVariant
 from mainapp.tests.mixins import BaseViewTestMixin
 
 
@@ -32,16 +37,207 @@ class GetModelAPIViewTest(BaseViewTestMixin, TestCase):
                 license=1,
                 latest=True,
             )
-            filepath = f"{settings.MODEL_DIR}/{self.model1.model_id}/{self.model1.revision}.glb"
-            self.model_dirs.append(os.path.dirname(filepath))
-            os.makedirs(os.path.dirname(filepath), exist_ok=True)
-            with open(filepath, "wb+") as destination:
-                destination.write(self.model_file)
+            self.store_file(self.model1, self.model_file)
         # now we have a total of 3 revisions of model1
         response = self.client.get(reverse("get_model", args=[self.model1.model_id, 2]))
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response["Content-Disposition"], f"attachment; filename={self.model1.model_id}_{2}.glb")
 
+    def test_get_model_strong_etag(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("get_model", args=[self.model1.model_id]))
+        self.assertEqual(response["ETag"], '"{}"'.format(hashlib.sha256(self.model_file).hexdigest()))
+        self.assertEqual(response["Cache-Control"], "public, max-age=86400")
+        self.assertNotIn("Last-Modified", response)
+
+        # downloads only read the model
+        self.assertFalse([query for query in queries if not query["sql"].startswith("SELECT")])
+
+    def test_get_model_not_modified(self):
+        response = self.client.get(reverse("get_model", args=[self.model1.model_id]))
+        etag = response["ETag"]
+
+        response = self.client.get(
+            reverse("get_model", args=[self.model1.model_id]), HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+        response = self.client.get(
+            reverse("get_model", args=[self.model1.model_id]), HTTP_IF_NONE_MATCH='"other"'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_get_model_revision_immutable(self):
+        url = reverse("get_model", args=[self.model1.model_id, self.model1.revision])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "public, max-age=31536000, immutable")
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(MODEL_SERVING="x-accel-redirect")
+    def test_get_model_x_accel_redirect_not_modified(self):
+        self.model1.file_hash = hashlib.sha256(self.model_file).hexdigest()
+        self.model1.save()
+        response = self.client.get(
+            reverse("get_model", args=[self.model1.model_id]),
+            HTTP_IF_NONE_MATCH='"{}"'.format(self.model1.file_hash),
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertNotIn("X-Accel-Redirect", response)
+
+    def test_get_model_range(self):
+        url = reverse("get_model", args=[self.model1.model_id])
+        size = len(self.model_file)
+
+        response = self.client.get(url)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+
+        response = self.client.get(url, HTTP_RANGE="bytes=0-11")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 0-11/{size}")
+        self.assertEqual(response["Content-Length"], "12")
+        self.assertEqual(b"".join(response.streaming_content), self.model_file[:12])
+
+        response = self.client.get(url, HTTP_RANGE="bytes=-4")
+        self.assertEqual(response["Content-Range"], f"bytes {size - 4}-{size - 1}/{size}")
+        self.assertEqual(b"".join(response.streaming_content), self.model_file[-4:])
+
+        response = self.client.get(url, HTTP_RANGE="bytes=10-")
+        self.assertEqual(b"".join(response.streaming_content), self.model_file[10:])
+
+    def test_get_model_range_unsatisfiable(self):
+        url = reverse("get_model", args=[self.model1.model_id])
+        size = len(self.model_file)
+        response = self.client.get(url, HTTP_RANGE=f"bytes={size}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{size}")
+
+    def test_get_model_range_ignored(self):
+        url = reverse("get_model", args=[self.model1.model_id])
+        for header in ["bytes=0-1,4-5", "bytes=5-1", "lines=0-1", "bytes=a-b"]:
+            response = self.client.get(url, HTTP_RANGE=header)
+            self.assertEqual(response.status_code, 200)
+
+        # the range of an outdated copy isn't sent
+        response = self.client.get(url, HTTP_RANGE="bytes=0-1", HTTP_IF_RANGE='"outdated"')
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        response = self.client.get(url, HTTP_RANGE="bytes=0-1", HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+
+    @override_settings(MODEL_SERVING="x-accel-redirect")
+    def test_get_model_x_accel_redirect_range(self):
+        # nginx sends the range
+        response = self.client.get(reverse("get_model", args=[self.model1.model_id]), HTTP_RANGE="bytes=0-1")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertIn("X-Accel-Redirect", response)
+
+    def test_get_model_compressed(self):
+        path = storage.blob_path(self.model1.file_hash)
+        with open(path + ".gz", "wb") as f:
+            f.write(gzip.compress(self.model_file))
+        url = reverse("get_model", args=[self.model1.model_id])
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Type"], "model/gltf-binary")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), self.model_file)
+        gzip_etag = response["ETag"]
+
+        response = self.client.get(url)
+        self.assertNotIn("Content-Encoding", response)
+        self.assertNotEqual(response["ETag"], gzip_etag)
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=gzip_etag)
+        self.assertEqual(response.status_code, 304)
+
+        # ranges are of the file itself
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip", HTTP_RANGE="bytes=0-3")
+        self.assertEqual(response.status_code, 206)
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(b"".join(response.streaming_content), b"glTF")
+
+    def test_get_model_variant(self):
+        path = storage.blob_path("a" * 64)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(b"glTF optimized")
+        ModelVariant.objects.create(
+            model=self.model1, name="optimized", file_hash="a" * 64, size=14
+        )
+
+        response = self.client.get(
+            reverse("get_model", args=[self.model1.model_id]), {"variant": "optimized"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"glTF optimized")
+        self.assertEqual(response["ETag"], '"{}"'.format("a" * 64))
+        self.assertEqual(
+            response["Content-Disposition"],
+            f"attachment; filename={self.model1.model_id}_{self.model1.revision}_optimized.glb",
+        )
+
+    def test_get_model_lod(self):
+        path = storage.blob_path("b" * 64)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(b"glTF lod")
+        ModelVariant.objects.create(
+            model=self.model1, name="lod1", file_hash="b" * 64, size=8, triangle_count=1
+        )
+        url = reverse("get_model", args=[self.model1.model_id, self.model1.revision])
+
+        response = self.client.get(url, {"lod": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"glTF lod")
+
+        response = self.client.get(url, {"lod": 0})
+        self.assertEqual(b"".join(response.streaming_content), self.model_file)
+
+        self.assertEqual(self.client.get(url, {"lod": 2}).status_code, 404)
+        self.assertEqual(self.client.get(url, {"lod": "-1"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"lod": 1, "variant": "optimized"}).status_code, 400)
+
+    def test_get_model_variant_not_found(self):
+        response = self.client.get(
+            reverse("get_model", args=[self.model1.model_id]), {"variant": "../../1"}
+        )
+        self.assertEqual(response.status_code, 404)
+
     def test_get_model_hidden_non_admin(self):
         response = self.client.get(reverse("get_model", args=[self.model2.model_id]))
         self.assertEqual(response.status_code, 404)
+
+    @override_settings(MODEL_SERVING="x-accel-redirect", MODEL_ACCEL_REDIRECT_LOCATION="/protected/models")
+    def test_get_model_x_accel_redirect(self):
+        response = self.client.get(reverse("get_model", args=[self.model1.model_id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["X-Accel-Redirect"],
+            f"/protected/models/{storage.blob_name(self.model1.file_hash)}",
+        )
+        self.assertEqual(response["Content-Type"], "model/gltf-binary")
+        self.assertEqual(response.content, b"")
+
+    @override_settings(MODEL_SERVING="x-sendfile")
+    def test_get_model_x_sendfile(self):
+        response = self.client.get(reverse("get_model", args=[self.model1.model_id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["X-Sendfile"],
+            os.path.abspath(storage.blob_path(self.model1.file_hash)),
+        )
+        self.assertEqual(response.content, b"")
+
+    @override_settings(MODEL_SERVING="x-accel-redirect")
+    def test_get_model_x_accel_redirect_hidden_non_admin(self):
+        response = self.client.get(reverse("get_model", args=[self.model2.model_id]))
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn("X-Accel-Redirect", response)
@@ -0,0 +1,51 @@
+import os
+
+from django.test import TestCase
+from django.urls import reverse
+
+from mainapp import storage
+from mainapp.tests.mixins import BaseViewTestMixin
+
+
+class GetThumbnailAPIViewTest(BaseViewTestMixin, TestCase):
+    """
+    Tests for the get_thumbnail API view in the mainapp.
+    """
+
+    def setUp(self):
+        super().setUp()
+        path = storage.blob_path("d" * 64, "png")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(b"\x89PNG thumbnail")
+        self.model1.thumbnail_hash = "d" * 64
+        self.model1.save()
+
+    def test_get_thumbnail_success(self):
+        response = self.client.get(
+            reverse("get_thumbnail", args=[self.model1.model_id, self.model1.revision])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertEqual(response["Cache-Control"], "public, max-age=31536000, immutable")
+        self.assertEqual(b"".join(response.streaming_content), b"\x89PNG thumbnail")
+
+    def test_get_thumbnail_latest(self):
+        response = self.client.get(reverse("get_thumbnail", args=[self.model1.model_id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "public, max-age=86400")
+
+    def test_get_thumbnail_not_modified(self):
+        response = self.client.get(
+            reverse("get_thumbnail", args=[self.model1.model_id]),
+            HTTP_IF_NONE_MATCH='"{}"'.format("d" * 64),
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_get_thumbnail_missing(self):
+        response = self.client.get(reverse("get_thumbnail", args=[self.model3.model_id]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_get_thumbnail_hidden_non_admin(self):
+        response = self.client.get(reverse("get_thumbnail", args=[self.model2.model_id]))
+        self.assertEqual(response.status_code, 404)
@@ -2,6 +2,7 @@ import json
 from django.test import TestCase
 from django.urls import reverse
 
+from mainapp.models import Location, Model
 from mainapp.tests.mixins import BaseViewTestMixin
 
 
@@ -34,6 +35,18 @@ class LookupTagAPIViewTests(BaseViewTestMixin, TestCase):
         self.assertEqual(len(data), 0)
 
 
+    def test_lookup_tag_cursor(self):
+        response = self.client.get(reverse("lookup_tag", args=["size=small"]), {"cursor": ""})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["results"], [self.model3.model_id])
+        self.assertIsNone(data["next"])
+
+    def test_lookup_tag_invalid_cursor_400(self):
+        response = self.client.get(reverse("lookup_tag", args=["size=small"]), {"cursor": "@@"})
+        self.assertEqual(response.status_code, 400)
+
+
 class LookupCategoryAPIViewTests(BaseViewTestMixin, TestCase):
 
     def test_lookup_category_success(self):
@@ -73,6 +86,47 @@ class LookupRangeAPIViewTests(BaseViewTestMixin, TestCase):
         data = response.json()
         self.assertIn(self.model1.model_id, data)
 
+    def test_search_range_excludes_box_corners(self):
+        # inside the bounding box of a 1000m circle, but about 1250m away
+        corner_model = Model.objects.create(
+            model_id=4,
+            revision=1,
+            title="Corner Model",
+            author=self.user,
+            location=Location.objects.create(
+                latitude=self.model1.location.latitude + 0.008,
+                longitude=self.model1.location.longitude + 0.012,
+            ),
+            license=0,
+            latest=True,
+        )
+        response = self.client.get(
+            reverse(
+                "lookup_range",
+                args=[self.model1.location.latitude, self.model1.location.longitude, 1000],
+            )
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertIn(self.model1.model_id, data)
+        self.assertNotIn(corner_model.model_id, data)
+
+    def test_search_range_across_antimeridian(self):
+        model = Model.objects.create(
+            model_id=4,
+            revision=1,
+            title="Antimeridian Model",
+            author=self.user,
+            location=Location.objects.create(latitude=-16.5, longitude=179.999),
+            license=0,
+            latest=True,
+        )
+        response = self.client.get(
+            reverse("lookup_range", args=[-16.5, -179.999, 1000])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [model.model_id])
+
     def test_search_range_invalid_params_404(self):
         response = self.client.get(
             f"/api/search/invalid/10.0/1000/1"
@@ -90,6 +144,43 @@ class LookupRangeAPIViewTests(BaseViewTestMixin, TestCase):
         self.assertEqual(response.status_code, 404)
 
 
+class SearchNearestAPIViewTests(BaseViewTestMixin, TestCase):
+
+    def test_search_nearest_sorted_by_distance(self):
+        far_model = Model.objects.create(
+            model_id=4,
+            revision=1,
+            title="Far Model",
+            author=self.user,
+            location=Location.objects.create(latitude=48.9, longitude=2.4),
+            license=0,
+            latest=True,
+        )
+        response = self.client.get(reverse("search_nearest", args=[48.8566, 2.3522, 10]))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+
+        # model2 is hidden
+        self.assertEqual(
+            [result[0] for result in data],
+            [self.model1.model_id, far_model.model_id, self.model3.model_id],
+        )
+        self.assertAlmostEqual(data[0][1], 0, places=3)
+        self.assertAlmostEqual(data[1][1], 6000, delta=500)
+
+    def test_search_nearest_count(self):
+        response = self.client.get(reverse("search_nearest", args=[2.3522, 48.8566, 1]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result[0] for result in response.json()], [self.model3.model_id])
+
+    def test_search_nearest_invalid_params_400(self):
+        response = self.client.get(reverse("search_nearest", args=[0, 0, 0]))
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(reverse("search_nearest", args=[95, 0, 1]))
+        self.assertEqual(response.status_code, 400)
+
+
 class LookupTitleAPIViewTests(BaseViewTestMixin, TestCase):
 
     def test_search_title_success(self):
@@ -98,4 +189,19 @@ class LookupTitleAPIViewTests(BaseViewTestMixin, TestCase):
         data = response.json()
         self.assertIn(self.model1.model_id, data)
 
+    def test_search_title_ignores_description(self):
+        Model.objects.create(
+            model_id=4,
+            revision=1,
+            title="Landmark",
+            description="A model of the Eiffel Tower",
+            author=self.user,
+            license=0,
+            latest=True,
+        )
+        response = self.client.get(reverse("search_title", args=["eiffel"]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
 
+        response = self.client.get(reverse("search_title", args=["landm"]))
+        self.assertEqual(response.json(), [4])
@@ -0,0 +1,95 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from mainapp.models import Location, Model
+from mainapp.tests.mixins import BaseViewTestMixin
+
+
+class MapTileAPIViewTest(BaseViewTestMixin, TestCase):
+    """
+    Tests for the map_tile API view in the mainapp.
+    """
+
+    def test_map_tile_world(self):
+        response = self.client.get(reverse("map_tile", args=[0, 0, 0]))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(
+            data,
+            [
+                [self.model1.model_id, self.model1.title, self.model1.location.latitude, self.model1.location.longitude],
+                [self.model3.model_id, self.model3.title, self.model3.location.latitude, self.model3.location.longitude],
+            ],
+        )
+
+    def test_map_tile_bounds(self):
+        # the tile of model1 (Paris) at zoom 10, and the one east of it
+        response = self.client.get(reverse("map_tile", args=[10, 518, 352]))
+        self.assertEqual([pin[0] for pin in response.json()], [self.model1.model_id])
+
+        response = self.client.get(reverse("map_tile", args=[10, 519, 352]))
+        self.assertEqual(response.json(), [])
+
+    def test_map_tile_hidden_admin(self):
+        self.login_user(user_type="admin")
+        response = self.client.get(reverse("map_tile", args=[0, 0, 0]))
+        self.assertIn(self.model2.model_id, [pin[0] for pin in response.json()])
+
+    def test_map_tile_etag(self):
+        response = self.client.get(reverse("map_tile", args=[0, 0, 0]))
+        etag = response["ETag"]
+
+        response = self.client.get(reverse("map_tile", args=[0, 0, 0]), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.model1.title = "Renamed Model 1"
+        self.model1.save()
+
+        response = self.client.get(reverse("map_tile", args=[0, 0, 0]), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_map_tile_invalid_400(self):
+        response = self.client.get(reverse("map_tile", args=[1, 2, 0]))
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(reverse("map_tile", args=[19, 0, 0]))
+        self.assertEqual(response.status_code, 400)
+
+
+class MapClustersAPIViewTest(BaseViewTestMixin, TestCase):
+    """
+    Tests for the map_clusters API view in the mainapp.
+    """
+
+    def test_map_clusters_world(self):
+        Model.objects.create(
+            model_id=4,
+            revision=1,
+            title="Model 4",
+            author=self.user,
+            location=Location.objects.create(latitude=48.8606, longitude=2.3376),
+            license=0,
+            latest=True,
+        )
+        response = self.client.get(reverse("map_clusters", args=[0, 0, 0]))
+        self.assertEqual(response.status_code, 200)
+        data = sorted(response.json(), key=lambda cluster: cluster[2])
+
+        # model2 is hidden, model3 is on its own and model1 and model4 are both in Paris
+        self.assertEqual(len(data), 2)
+        self.assertEqual(data[0], [self.model3.location.latitude, self.model3.location.longitude, 1])
+        self.assertAlmostEqual(data[1][0], (48.8566 + 48.8606) / 2)
+        self.assertAlmostEqual(data[1][1], (2.3522 + 2.3376) / 2)
+        self.assertEqual(data[1][2], 2)
+
+    def test_map_clusters_etag(self):
+        response = self.client.get(reverse("map_clusters", args=[0, 0, 0]))
+        response = self.client.get(
+            reverse("map_clusters", args=[0, 0, 0]), HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_map_clusters_invalid_400(self):
+        response = self.client.get(reverse("map_clusters", args=[0, 1, 0]))
+        self.assertEqual(response.status_code, 400)
@@ -49,6 +49,40 @@ class SearchFullAPIViewTest(BaseViewTestMixin, TestCase):
         self.assertEqual(len(results), 2)
         self.assertSetEqual({result[1] for result in results}, {"Model 1", "Model 3"})
 
+    def test_search_full_lods_format(self):
+        self.model1.triangle_count = 120
+        self.model1.save()
+        payload = {"title": "Model 1", "format": ["id", "lods"]}
+        response = self.client.post(
+            reverse("search_full"),
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [[self.model1.model_id, [120]]])
+
+    def test_search_full_stats_format_and_max_faces(self):
+        self.model1.stats = {"faces": 120, "meshes": 1}
+        self.model1.save()
+        self.model3.stats = {"faces": 50000, "meshes": 4}
+        self.model3.save()
+
+        payload = {"max_faces": 1000, "format": ["id", "stats"]}
+        response = self.client.post(
+            reverse("search_full"),
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [[self.model1.model_id, {"faces": 120, "meshes": 1}]])
+
+        response = self.client.post(
+            reverse("search_full"),
+            data=json.dumps({"max_faces": "many"}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+
     def test_search_full_tags_filter(self):
         payload = {"tags": {"color": "red"}, "format": ["id", "title"]}
         response = self.client.post(
@@ -61,6 +95,33 @@ class SearchFullAPIViewTest(BaseViewTestMixin, TestCase):
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0][1], "Model 1")
 
+    def test_search_full_multiple_tags_filter(self):
+        payload = {"tags": {"color": "blue", "size": "small"}, "format": ["id"]}
+        response = self.client.post(
+            reverse("search_full"),
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [[self.model3.model_id]])
+
+        payload = {"tags": {"color": "blue", "size": "large"}}
+        response = self.client.post(
+            reverse("search_full"),
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+        self.assertEqual(response.json(), [])
+
+    def test_search_full_invalid_tags_400(self):
+        payload = {"tags": ["color=red"]}
+        response = self.client.post(
+            reverse("search_full"),
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+
     def test_search_full_categories_filter(self):
         payload = {"categories": ["category1"], "format": ["id", "title"]}
         response = self.client.post(
@@ -73,6 +134,35 @@ class SearchFullAPIViewTest(BaseViewTestMixin, TestCase):
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0][1], "Model 1")
 
+    def test_search_full_multiple_categories_filter(self):
+        self.model3.categories.add(self.cat1)
+
+        payload = {"categories": ["category1", "category3"], "format": ["id"]}
+        response = self.client.post(
+            reverse("search_full"),
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [[self.model3.model_id]])
+
+        payload = {"categories": ["category1", "nonexistent"]}
+        response = self.client.post(
+            reverse("search_full"),
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+        self.assertEqual(response.json(), [])
+
+    def test_search_full_invalid_categories_400(self):
+        payload = {"categories": "category1"}
+        response = self.client.post(
+            reverse("search_full"),
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+
     def test_search_full_location_filter(self):
         payload = {
             "lat": 48.8566,
@@ -122,6 +212,45 @@ class SearchFullAPIViewTest(BaseViewTestMixin, TestCase):
         data_page2 = response_page2.json()
         self.assertTrue(0 < len(data_page2) <= RESULTS_PER_API_CALL)
 
+    def test_search_full_cursor_pagination(self):
+        for i in range(RESULTS_PER_API_CALL + 5):
+            Model.objects.create(
+                model_id=100 + i,
+                revision=1,
+                title=f"Paged API Model {i}",
+                author=self.user,
+                is_hidden=False,
+                license=1,
+                latest=True,
+            )
+
+        model_ids = []
+        cursor = ""
+        while cursor is not None:
+            payload = {"author": self.user.profile.uid, "format": ["id"], "cursor": cursor}
+            response = self.client.post(
+                reverse("search_full"),
+                data=json.dumps(payload),
+                content_type="application/json",
+            )
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertTrue(len(data["results"]) <= RESULTS_PER_API_CALL)
+            model_ids += [result[0] for result in data["results"]]
+            cursor = data["next"]
+
+        self.assertEqual(len(model_ids), RESULTS_PER_API_CALL + 7)
+        self.assertEqual(model_ids, sorted(model_ids))
+
+    def test_search_full_invalid_cursor_400(self):
+        payload = {"cursor": "not a cursor"}
+        response = self.client.post(
+            reverse("search_full"),
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+
     def test_search_full_empty_page_result(self):
         payload = {"author": self.user.profile.uid, "page": 999}
         response = self.client.post(
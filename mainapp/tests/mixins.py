@@ -1,12 +1,14 @@
-import os
+import hashlib
 import shutil
 import tempfile
 
 from django.conf import settings
+from django.core.files.base import ContentFile
 from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
 from social_django.models import UserSocialAuth
 
+from mainapp import storage
 from mainapp.models import Category, Location, Model
 
 
@@ -90,17 +92,20 @@ class BaseViewTestMixin(TestCase):
         self.cat3 = Category.objects.create(name="category3")
         self.model3.categories.set([self.cat3])
 
-        self.model_dirs = []
-
         for model in [self.model1, self.model2, self.model3]:
-            filepath = f"{settings.MODEL_DIR}/{model.model_id}/{model.revision}.glb"
-            self.model_dirs.append(os.path.dirname(filepath))
-            os.makedirs(os.path.dirname(filepath), exist_ok=True)
-            with open(filepath, "wb+") as destination:
-                destination.write(self.model_file)
+            self.store_file(model, self.model_file)
+
+    def store_file(self, model, data):
+        """
+        Helper method to store the file of a model in the blob store.
+        """
+        model.file_hash = hashlib.sha256(data).hexdigest()
+        model.save()
+        if not storage.blob_exists(model.file_hash):
+            storage.model_storage().save(storage.blob_name(model.file_hash), ContentFile(data))
 
     def tearDown(self) -> None:
-        shutil.rmtree(settings.MODEL_DIR)
+        shutil.rmtree(settings.MODEL_DIR, ignore_errors=True)
 
     def login_user(self, user_type="user"):
         """
@@ -1,15 +1,17 @@
 import os
 import shutil
 import tempfile
+from unittest.mock import patch
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError, transaction
 from django.test import TestCase, override_settings
 
-from mainapp import database
+from mainapp import database, storage
 from mainapp.markdown import markdown
-from mainapp.models import Category, Change, Location, Model
+from mainapp.models import Category, Change, Location, Model, ModelVariant
 
 
 User = get_user_model()
@@ -80,9 +82,7 @@ class DatabaseTests(TestCase):
         self.assertEqual(created_model.location.latitude, options["latitude"])
         self.assertEqual(created_model.location.longitude, options["longitude"])
 
-        expected_filepath = os.path.join(
-            settings.MODEL_DIR, str(created_model.model_id), f"{created_model.revision}.glb"
-        )
+        expected_filepath = storage.blob_path(created_model.file_hash)
         self.assertTrue(os.path.exists(expected_filepath))
 
     def test_upload_new_model_increments_model_id(self):
@@ -215,9 +215,7 @@ class DatabaseTests(TestCase):
         )
         self.assertEqual(Location.objects.count(), 2)
 
-        expected_filepath_rev = os.path.join(
-            settings.MODEL_DIR, str(revised_model.model_id), f"{revised_model.revision}.glb"
-        )
+        expected_filepath_rev = storage.blob_path(revised_model.file_hash)
         self.assertTrue(os.path.exists(expected_filepath_rev))
 
     def test_edit_model_metadata(self):
@@ -374,15 +372,14 @@ class DatabaseTests(TestCase):
         created_model = database.upload(model_file, options)
         self.assertIsNotNone(created_model)
 
-        delete_result = database.delete(created_model.model_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            delete_result = database.delete(created_model.model_id)
         self.assertTrue(delete_result, "Delete should return True on success")
 
         with self.assertRaises(Model.DoesNotExist):
             Model.objects.get(pk=created_model.pk)
 
-        expected_path = os.path.join(
-            settings.MODEL_DIR, str(created_model.model_id), str(created_model.revision)
-        )
+        expected_path = storage.blob_path(created_model.file_hash)
         self.assertFalse(os.path.exists(expected_path), "Model file should be deleted")
 
         self.assertEqual(Change.objects.filter(model=created_model).count(), 0)
@@ -418,16 +415,17 @@ class DatabaseTests(TestCase):
         model_rev2 = database.upload(model_file, revision_options)
         self.assertIsNotNone(model_rev2)
 
-        delete_result = database.delete(model_rev2.model_id, model_rev2.revision)
+        with self.captureOnCommitCallbacks(execute=True):
+            delete_result = database.delete(model_rev2.model_id, model_rev2.revision)
         self.assertTrue(delete_result, "Delete should return True on success")
 
         with self.assertRaises(Model.DoesNotExist):
             Model.objects.get(pk=model_rev2.pk)
 
-        expected_path = os.path.join(
-            settings.MODEL_DIR, str(model_rev2.model_id), str(model_rev2.revision)
-        )
-        self.assertFalse(os.path.exists(expected_path), "Model file for revision 2 should be deleted")
+        # the revisions have identical files, which are stored once
+        self.assertEqual(model_rev2.file_hash, created_model.file_hash)
+        expected_path = storage.blob_path(model_rev2.file_hash)
+        self.assertTrue(os.path.exists(expected_path), "Model file shared with revision 1 should be kept")
         
         self.assertEqual(Change.objects.filter(model=model_rev2).count(), 0)
 
@@ -436,32 +434,154 @@ class DatabaseTests(TestCase):
         created_model.refresh_from_db()
         self.assertFalse(created_model.latest)
 
-        delete_result = database.delete(model_rev1.model_id, model_rev1.revision)
+        with self.captureOnCommitCallbacks(execute=True):
+            delete_result = database.delete(model_rev1.model_id, model_rev1.revision)
         self.assertTrue(delete_result, "Delete should return True on success")
 
         with self.assertRaises(Model.DoesNotExist):
             Model.objects.get(pk=model_rev1.pk)
 
-        expected_path = os.path.join(
-            settings.MODEL_DIR, str(model_rev1.model_id), str(model_rev1.revision)
-        )
-        self.assertFalse(os.path.exists(expected_path), "Model file for revision 1 should be deleted")
+        self.assertTrue(os.path.exists(expected_path), "Model file shared with revision 1 should be kept")
 
         self.assertEqual(Change.objects.filter(model=model_rev1).count(), 0)
 
         created_model.refresh_from_db()
         self.assertTrue(created_model.latest)
 
-        delete_result = database.delete(created_model.model_id, created_model.revision)
+        with self.captureOnCommitCallbacks(execute=True):
+            delete_result = database.delete(created_model.model_id, created_model.revision)
         self.assertTrue(delete_result, "Delete should return True on success")
 
         with self.assertRaises(Model.DoesNotExist):
             Model.objects.get(pk=created_model.pk)
 
-        expected_path = os.path.join(
-            settings.MODEL_DIR, str(created_model.model_id), str(created_model.revision)
-        )
         self.assertFalse(os.path.exists(expected_path), "Model file for revision 1 should be deleted")
 
         self.assertEqual(Change.objects.filter(model=created_model).count(), 0)
         self.assertEqual(Model.objects.filter(model_id=created_model.model_id).count(), 0)
+
+    def _upload_options(self):
+        return {
+            "title": "Processed Model",
+            "description": "This model will be processed.",
+            "tags": {},
+            "categories": [],
+            "latitude": None,
+            "longitude": None,
+            "source": None,
+            "license": 0,
+            "author": self.user,
+            "translation": [0, 0, 0],
+            "rotation": 0,
+            "scale": 1,
+            "revision": False,
+        }
+
+    @override_settings(MODEL_OPTIMIZER="cp {input} {output}")
+    def test_upload_makes_optimized_variant(self):
+        created_model = database.upload(self._create_dummy_file(), self._upload_options())
+        self.assertIsNotNone(created_model)
+
+        variant = ModelVariant.objects.get(model=created_model, name="optimized")
+        self.assertEqual(variant.file_hash, created_model.file_hash)
+        self.assertEqual(variant.size, len(self.model_file))
+        variant_path = storage.blob_path(variant.file_hash)
+        self.assertTrue(os.path.isfile(variant_path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            database.delete(created_model.model_id)
+        self.assertFalse(os.path.exists(variant_path), "Variant files should be deleted")
+        self.assertEqual(os.listdir(os.path.join(settings.MODEL_DIR, storage.STAGING_DIR)), [])
+
+    @override_settings(MODEL_OPTIMIZER="false {input} {output}")
+    def test_upload_optimizer_failure(self):
+        created_model = database.upload(self._create_dummy_file(), self._upload_options())
+
+        self.assertIsNotNone(created_model, "A failed optimization should not fail the upload")
+        self.assertFalse(ModelVariant.objects.filter(model=created_model).exists())
+
+    @override_settings(MODEL_SIMPLIFIER="cp {input} {output}", MODEL_LOD_RATIOS=[0.5, 0.1])
+    def test_upload_makes_lods(self):
+        created_model = database.upload(self._create_dummy_file(), self._upload_options())
+
+        self.assertEqual(created_model.triangle_count, 26)
+        lods = ModelVariant.objects.filter(model=created_model).order_by("name")
+        self.assertEqual([lod.name for lod in lods], ["lod1", "lod2"])
+        self.assertEqual([lod.triangle_count for lod in lods], [26, 26])
+        self.assertEqual(created_model.listing.lod_triangles, [26, 26, 26])
+
+    @patch("mainapp.database.process_model", side_effect=OSError("No space left on device"))
+    def test_upload_processing_failure_keeps_the_upload(self, mock_process):
+        created_model = database.upload(self._create_dummy_file(), self._upload_options())
+
+        mock_process.assert_called_once()
+        self.assertIsNotNone(created_model)
+        self.assertEqual(Model.objects.filter(model_id=created_model.model_id).count(), 1)
+
+    def test_upload_stores_stats(self):
+        created_model = database.upload(self._create_dummy_file(), self._upload_options())
+
+        created_model.refresh_from_db()
+        self.assertEqual(created_model.stats["faces"], 26)
+        self.assertEqual(created_model.stats["meshes"], 1)
+        self.assertEqual(created_model.stats["materials"], 1)
+        self.assertEqual(created_model.stats["textures"], 1)
+        self.assertEqual(created_model.stats["animations"], 0)
+        self.assertEqual([round(length, 2) for length in created_model.stats["bounding_box"]], [0.6, 0.39, 0.6])
+        self.assertEqual(created_model.stats["size"], len(self.model_file))
+        self.assertEqual(created_model.listing.stats, created_model.stats)
+
+    @override_settings(MODEL_THUMBNAILER="cp {input} {output}")
+    def test_upload_renders_thumbnail(self):
+        created_model = database.upload(self._create_dummy_file(), self._upload_options())
+
+        created_model.refresh_from_db()
+        self.assertEqual(created_model.thumbnail_hash, created_model.file_hash)
+        self.assertTrue(os.path.isfile(storage.blob_path(created_model.thumbnail_hash, "png")))
+
+    def test_upload_revision_has_no_thumbnail_of_its_own(self):
+        with override_settings(MODEL_THUMBNAILER="cp {input} {output}"):
+            created_model = database.upload(self._create_dummy_file(), self._upload_options())
+
+        revision_file = SimpleUploadedFile("revision.glb", self.model_file + b"\0" * 4, content_type="model/gltf-binary")
+        revised_model = database.upload(revision_file, {
+            "model_id": created_model.model_id,
+            "author": self.user,
+            "revision": True,
+        })
+
+        revised_model.refresh_from_db()
+        self.assertIsNone(revised_model.thumbnail_hash)
+        created_model.refresh_from_db()
+        self.assertIsNotNone(created_model.thumbnail_hash)
+
+    def test_delete_rolled_back_keeps_files(self):
+        created_model = database.upload(self._create_dummy_file(), self._upload_options())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(DatabaseError):
+                with transaction.atomic():
+                    database.delete(created_model.model_id)
+                    raise DatabaseError()
+
+        self.assertTrue(Model.objects.filter(pk=created_model.pk).exists())
+        self.assertTrue(os.path.isfile(storage.blob_path(created_model.file_hash)))
+
+    @override_settings(MODEL_OPTIMIZER="cp {input} {output}")
+    def test_upload_identical_files_are_shared(self):
+        first = database.upload(self._create_dummy_file(), self._upload_options())
+        second = database.upload(self._create_dummy_file(), self._upload_options())
+
+        self.assertNotEqual(first.model_id, second.model_id)
+        self.assertEqual(first.file_hash, second.file_hash)
+        self.assertEqual(
+            ModelVariant.objects.get(model=second).file_hash,
+            ModelVariant.objects.get(model=first).file_hash,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            database.delete(first.model_id)
+        self.assertTrue(os.path.isfile(storage.blob_path(second.file_hash)))
+        with self.captureOnCommitCallbacks(execute=True):
+            database.delete(second.model_id)
+        self.assertFalse(os.path.exists(storage.blob_path(second.file_hash)))
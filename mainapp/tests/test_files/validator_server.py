@@ -0,0 +1,22 @@
+# A stand-in for mainapp/validator/server.mjs, writing the same valid report for
+# every file, with the id of its process. Files named slow.glb are never answered,
+# and the server exits on files named exit.glb.
+import os
+import sys
+import json
+
+for line in sys.stdin:
+    path = line.rstrip("\n")
+    name = os.path.basename(path)
+
+    if name == "exit.glb":
+        sys.exit(1)
+    if name == "slow.glb":
+        continue
+
+    sys.stdout.write(json.dumps({
+        "pid": os.getpid(),
+        "info": {"totalVertexCount": 24, "totalTriangleCount": 12},
+        "issues": {"numErrors": 0, "messages": []},
+    }) + "\n")
+    sys.stdout.flush()
@@ -0,0 +1,169 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .mixins import BaseViewTestMixin as BaseTestMixin
+from mainapp import database, ingest
+from mainapp.models import IngestJob, Model, ModelListing, ModelVariant
+from mainapp.utils.model_validator import INTERNAL_ERROR
+
+
+@override_settings(MODEL_INGEST="async")
+class IngestTest(BaseTestMixin, TestCase):
+    """Test cases for the asynchronous processing of uploads."""
+
+    def upload(self):
+        model_file = SimpleUploadedFile("test_model.glb", self.model_file, content_type="model/gltf-binary")
+        return database.upload(model_file, {
+            "title": "Queued Model",
+            "description": "This model is processed later.",
+            "tags": {},
+            "categories": [],
+            "latitude": None,
+            "longitude": None,
+            "source": None,
+            "license": 0,
+            "author": self.user,
+            "revision": False,
+        })
+
+    @override_settings(MODEL_OPTIMIZER="cp {input} {output}")
+    @patch("mainapp.ingest.validate_glb_path", return_value=None)
+    def test_upload_is_queued_then_processed(self, mock_validate):
+        created_model = self.upload()
+        self.assertEqual(created_model.status, Model.Status.PENDING)
+        self.assertTrue(IngestJob.objects.filter(model=created_model).exists())
+        self.assertFalse(ModelVariant.objects.filter(model=created_model).exists())
+
+        call_command("ingest_worker", "--once", "--workers", "1")
+
+        created_model.refresh_from_db()
+        mock_validate.assert_called_once()
+        self.assertEqual(created_model.status, Model.Status.READY)
+        self.assertFalse(IngestJob.objects.exists())
+        self.assertTrue(ModelVariant.objects.filter(model=created_model, name="optimized").exists())
+
+    @patch("mainapp.ingest.validate_glb_path")
+    def test_invalid_upload_fails(self, mock_validate):
+        errors = [{"message": "Invalid accessor.", "pointer": "/accessors/0"}]
+        mock_validate.return_value = errors
+        created_model = self.upload()
+
+        ingest.work(workers=1, once=True)
+
+        created_model.refresh_from_db()
+        self.assertEqual(created_model.status, Model.Status.FAILED)
+        self.assertEqual(created_model.processing_errors, errors)
+        self.assertFalse(created_model.latest)
+        self.assertFalse(ModelListing.objects.filter(model_id=created_model.model_id).exists())
+
+        response = self.client.get(reverse("model", args=[created_model.model_id, created_model.revision]))
+        self.assertContains(response, "This revision failed validation")
+        self.assertContains(response, "Invalid accessor.")
+
+    @patch("mainapp.ingest.validate_glb_path")
+    def test_shapeless_upload_fails(self, mock_validate):
+        mock_validate.side_effect = ValidationError("GLB file must have some valid shape.")
+        created_model = self.upload()
+
+        ingest.work(workers=1, once=True)
+
+        created_model.refresh_from_db()
+        self.assertEqual(created_model.status, Model.Status.FAILED)
+        self.assertEqual(created_model.processing_errors[0]["message"], "GLB file must have some valid shape.")
+
+    @patch("mainapp.ingest.validate_glb_path")
+    def test_internal_errors_are_retried(self, mock_validate):
+        mock_validate.side_effect = ValidationError("Internal server error.", code=INTERNAL_ERROR)
+        created_model = self.upload()
+
+        ingest.work(workers=1, once=True)
+
+        created_model.refresh_from_db()
+        self.assertEqual(mock_validate.call_count, ingest.MAX_ATTEMPTS)
+        self.assertEqual(created_model.status, Model.Status.FAILED)
+        self.assertFalse(IngestJob.objects.exists())
+
+    def upload_revision(self):
+        model_file = SimpleUploadedFile("revision.glb", self.model_file, content_type="model/gltf-binary")
+        return database.upload(model_file, {
+            "model_id": self.model1.model_id,
+            "author": self.user,
+            "revision": True,
+        })
+
+    @patch("mainapp.ingest.validate_glb_path", return_value=None)
+    def test_pending_revision_is_not_served(self, mock_validate):
+        revision = self.upload_revision()
+        self.assertEqual(revision.revision, 2)
+        self.assertFalse(revision.latest)
+
+        self.assertEqual(self.client.get(reverse("get_info", args=[self.model1.model_id])).json()["revision"], 1)
+        self.assertEqual(self.client.get(reverse("get_model", args=[self.model1.model_id, 2])).status_code, 404)
+        self.assertEqual(self.client.get(reverse("get_thumbnail", args=[self.model1.model_id, 2])).status_code, 404)
+        self.assertEqual(self.client.get(reverse("get_model", args=[self.model1.model_id])).status_code, 200)
+
+        # a second revision is numbered after the pending one
+        self.assertEqual(self.upload_revision().revision, 3)
+
+        ingest.work(workers=1, once=True)
+
+        self.assertEqual(Model.objects.get(model_id=self.model1.model_id, latest=True).revision, 3)
+        self.assertEqual(self.client.get(reverse("get_model", args=[self.model1.model_id, 2])).status_code, 200)
+
+    @patch("mainapp.ingest.validate_glb_path")
+    def test_failed_revision_keeps_the_latest_one(self, mock_validate):
+        mock_validate.return_value = [{"message": "Invalid accessor.", "pointer": "/accessors/0"}]
+        revision = self.upload_revision()
+
+        ingest.work(workers=1, once=True)
+
+        revision.refresh_from_db()
+        self.assertEqual(revision.status, Model.Status.FAILED)
+        self.model1.refresh_from_db()
+        self.assertTrue(self.model1.latest)
+        listing = ModelListing.objects.get(model_id=self.model1.model_id)
+        self.assertEqual(listing.latest_revision, self.model1)
+        self.assertFalse(listing.is_hidden)
+        self.assertEqual(self.client.get(reverse("get_model", args=[self.model1.model_id, 2])).status_code, 404)
+
+    def test_leased_jobs_are_skipped(self):
+        created_model = self.upload()
+        IngestJob.objects.filter(model=created_model).update(
+            locked_until=timezone.now() + timedelta(minutes=5))
+        self.assertIsNone(ingest.claim_job())
+
+        # the lease of a worker that died expires
+        IngestJob.objects.filter(model=created_model).update(
+            locked_until=timezone.now() - timedelta(minutes=5))
+        job = ingest.claim_job()
+        self.assertEqual(job.model, created_model)
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNone(ingest.claim_job())
+
+    @patch("mainapp.forms.validate_glb_file")
+    def test_upload_view_does_not_wait_for_validation(self, mock_validate):
+        response = self.client.post(reverse("upload"), data={
+            "title": "Queued Model",
+            "description": "This model is processed later.",
+            "model_source": "self_created",
+            "license": "0",
+            "model_file": SimpleUploadedFile("test_model.glb", self.model_file, "model/gltf-binary"),
+        })
+
+        created_model = Model.objects.get(title="Queued Model")
+        self.assertRedirects(response, reverse("model", args=[created_model.model_id, created_model.revision]))
+        mock_validate.assert_not_called()
+        self.assertEqual(created_model.status, Model.Status.PENDING)
+
+        response = self.client.get(reverse("model", args=[created_model.model_id, created_model.revision]))
+        self.assertContains(response, "This revision is being processed.")
+        # the model file isn't served until it is validated
+        self.assertNotContains(response, 'rel="preload"')
+        self.assertNotContains(response, 'class="render-pane"')
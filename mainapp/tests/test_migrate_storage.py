@@ -0,0 +1,55 @@
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase
+
+from .mixins import BaseViewTestMixin as BaseTestMixin
+from mainapp import storage
+from mainapp.models import Model, ModelVariant
+
+
+class MigrateStorageCommandTest(BaseTestMixin, TestCase):
+    """Test cases for the migrate_storage command."""
+
+    def write_legacy_file(self, name, data):
+        path = os.path.join(settings.MODEL_DIR, str(self.legacy.model_id), name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def setUp(self):
+        super().setUp()
+        self.legacy = Model.objects.create(
+            model_id=4,
+            revision=1,
+            title="Legacy Model",
+            author=self.user,
+            license=0,
+            latest=True,
+        )
+        self.model_path = self.write_legacy_file("1.glb", self.model_file)
+        self.write_legacy_file("1.glb.gz", b"compressed")
+        self.variant_path = self.write_legacy_file("1.optimized.glb", b"glTF optimized")
+        ModelVariant.objects.create(
+            model=self.legacy,
+            name="optimized",
+            file_hash=hashlib.sha256(b"glTF optimized").hexdigest(),
+            size=14,
+        )
+
+    def test_handle_moves_files_into_blobs(self):
+        call_command("migrate_storage", stdout=open(os.devnull, "w"))
+
+        self.legacy.refresh_from_db()
+        self.assertEqual(self.legacy.file_hash, hashlib.sha256(self.model_file).hexdigest())
+        self.assertTrue(os.path.isfile(storage.blob_path(self.legacy.file_hash)))
+        self.assertTrue(os.path.isfile(storage.blob_path(self.legacy.file_hash) + ".gz"))
+        self.assertTrue(os.path.isfile(storage.blob_path(hashlib.sha256(b"glTF optimized").hexdigest())))
+        self.assertFalse(os.path.exists(os.path.dirname(self.model_path)))
+
+        # running it again changes nothing
+        call_command("migrate_storage", stdout=open(os.devnull, "w"))
+        self.assertTrue(os.path.isfile(storage.blob_path(self.legacy.file_hash)))
@@ -0,0 +1,111 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from social_django.models import UserSocialAuth
+
+from mainapp import database
+from mainapp.models import Category, Model, ModelListing
+
+
+User = get_user_model()
+
+
+@override_settings(
+    MODEL_DIR=tempfile.mkdtemp(prefix="3dmr_")
+)
+class ModelListingTests(TestCase):
+    """Tests that ModelListing follows the latest revision of models."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="userpassword"
+        )
+        UserSocialAuth.objects.create(user=self.user, provider="test-provider", uid="1234567890")
+
+        with open("mainapp/tests/test_files/test_model.glb", "rb") as f:
+            self.model_file = f.read()
+
+        self.model = database.upload(self._create_dummy_file(), {
+            "title": "Listed Model",
+            "description": "Description.",
+            "tags": {"building": "yes"},
+            "categories": ["ListedCat1", "ListedCat2"],
+            "latitude": 10.0,
+            "longitude": 20.0,
+            "source": None,
+            "license": 0,
+            "author": self.user,
+            "revision": False,
+        })
+
+    def tearDown(self):
+        shutil.rmtree(settings.MODEL_DIR)
+
+    def _create_dummy_file(self):
+        return SimpleUploadedFile("test_model.glb", self.model_file, content_type="model/gltf-binary")
+
+    def test_upload_creates_listing(self):
+        listing = ModelListing.objects.get(model_id=self.model.model_id)
+        self.assertEqual(listing.latest_revision, self.model)
+        self.assertEqual(listing.title, "Listed Model")
+        self.assertEqual(listing.latitude, 10.0)
+        self.assertEqual(listing.longitude, 20.0)
+        self.assertEqual(listing.author_uid, "1234567890")
+        self.assertCountEqual(listing.categories, ["ListedCat1", "ListedCat2"])
+        self.assertEqual(listing.tags, {"building": "yes"})
+        self.assertFalse(listing.is_hidden)
+
+    def test_revision_moves_listing(self):
+        revision = database.upload(self._create_dummy_file(), {
+            "revision": True,
+            "model_id": self.model.model_id,
+            "author": self.user,
+        })
+
+        listing = ModelListing.objects.get(model_id=self.model.model_id)
+        self.assertEqual(listing.latest_revision, revision)
+        self.assertCountEqual(listing.categories, ["ListedCat1", "ListedCat2"])
+        self.assertEqual(ModelListing.objects.count(), 1)
+
+    def test_edit_updates_listing(self):
+        database.edit({
+            "model_id": self.model.model_id,
+            "revision": self.model.revision,
+            "title": "Edited Model",
+            "description": "Description.",
+            "tags": {"building": "no"},
+            "categories": ["EditedCat"],
+            "latitude": None,
+            "longitude": None,
+            "source": None,
+            "license": 0,
+        })
+
+        listing = ModelListing.objects.get(model_id=self.model.model_id)
+        self.assertEqual(listing.title, "Edited Model")
+        self.assertIsNone(listing.latitude)
+        self.assertIsNone(listing.longitude)
+        self.assertEqual(listing.categories, ["EditedCat"])
+        self.assertEqual(listing.tags, {"building": "no"})
+
+    def test_hide_updates_listing(self):
+        self.model.is_hidden = True
+        self.model.save()
+
+        self.assertTrue(ModelListing.objects.get(model_id=self.model.model_id).is_hidden)
+
+    def test_category_side_changes_update_listing(self):
+        category = Category.objects.create(name="AddedFromCategory")
+        category.model_set.add(self.model)
+
+        listing = ModelListing.objects.get(model_id=self.model.model_id)
+        self.assertIn("AddedFromCategory", listing.categories)
+
+    def test_delete_removes_listing(self):
+        database.delete(self.model.model_id)
+
+        self.assertFalse(ModelListing.objects.filter(model_id=self.model.model_id).exists())
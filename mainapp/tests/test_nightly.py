@@ -7,6 +7,7 @@ from django.conf import settings
 from django.utils.dateformat import format
 
 from .mixins import BaseViewTestMixin as BaseTestMixin
+from mainapp import storage
 from mainapp.models import Model
 
 
@@ -49,8 +50,8 @@ class NightlyDumpCommandTest(BaseTestMixin, TestCase):
                     })}\n'''
             )
             mock_open().write.assert_any_call(',')
-            model_path = '{}/{}/{}'.format(settings.MODEL_DIR, model.model_id, model.revision)
-            mock_zip.write.assert_any_call(f"{model_path}.glb", f"models/{model.model_id}.glb")
+            model_path = storage.blob_path(model.file_hash)
+            mock_zip.write.assert_any_call(model_path, f"models/{model.model_id}.glb")
 
         mock_open().write.assert_any_call('}')
         mock_zip.write.assert_any_call('info.json')
@@ -0,0 +1,186 @@
+import os
+from unittest import skipUnless
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+try:
+    import boto3
+    from moto import mock_aws
+except ImportError: # the object store tests need boto3 and moto, a local stand-in for S3
+    mock_aws = None
+
+from .mixins import BaseViewTestMixin as BaseTestMixin
+from mainapp import database, storage
+from mainapp.models import ModelVariant
+
+
+# a remote storage, without paths on a local filesystem
+IN_MEMORY_STORAGES = dict(settings.STORAGES, models={
+    "BACKEND": "django.core.files.storage.InMemoryStorage",
+})
+
+S3_BUCKET = "models"
+S3_STORAGES = dict(settings.STORAGES, models={
+    "BACKEND": "storages.backends.s3.S3Storage",
+    "OPTIONS": {
+        "bucket_name": S3_BUCKET,
+        "region_name": "us-east-1",
+        "access_key": "testing",
+        "secret_key": "testing",
+        "file_overwrite": True,
+    },
+})
+
+
+class StorageTestMixin:
+    def upload(self):
+        model_file = SimpleUploadedFile("test_model.glb", self.model_file, content_type="model/gltf-binary")
+        return database.upload(model_file, {
+            "title": "Stored Model",
+            "description": "This model is stored remotely.",
+            "tags": {},
+            "categories": [],
+            "latitude": None,
+            "longitude": None,
+            "source": None,
+            "license": 0,
+            "author": self.user,
+            "revision": False,
+        })
+
+    def staged_files(self):
+        directory = os.path.join(settings.MODEL_DIR, storage.STAGING_DIR)
+        return os.listdir(directory) if os.path.isdir(directory) else []
+
+
+class FileSystemStorageTest(StorageTestMixin, BaseTestMixin, TestCase):
+    """Test cases for the default storage, in MODEL_DIR."""
+
+    def test_blobs_are_in_model_dir(self):
+        self.assertTrue(storage.is_local())
+        self.assertEqual(
+            storage.blob_path(self.model1.file_hash),
+            os.path.join(os.path.abspath(settings.MODEL_DIR), storage.blob_name(self.model1.file_hash)),
+        )
+
+        with storage.local_blob(self.model1.file_hash) as path:
+            self.assertEqual(path, storage.blob_path(self.model1.file_hash))
+        self.assertTrue(os.path.isfile(storage.blob_path(self.model1.file_hash)))
+
+    def test_commit_blob(self):
+        path, file_hash = storage.stage_chunks([b"first", b"second"])
+        self.assertTrue(storage.commit_blob(path, file_hash))
+        self.assertFalse(os.path.exists(path))
+
+        with storage.open_blob(file_hash) as f:
+            self.assertEqual(f.read(), b"firstsecond")
+
+        # an identical file is not stored again
+        path, same_hash = storage.stage_chunks([b"firstsecond"])
+        self.assertEqual(same_hash, file_hash)
+        self.assertFalse(storage.commit_blob(path, file_hash))
+        self.assertFalse(os.path.exists(path))
+
+
+@override_settings(STORAGES=IN_MEMORY_STORAGES)
+class RemoteStorageTest(StorageTestMixin, BaseTestMixin, TestCase):
+    """Test cases for storages that don't keep the blobs on a local filesystem."""
+
+    def test_commit_blob_uploads_staged_file(self):
+        self.assertFalse(storage.is_local())
+
+        path, file_hash = storage.stage_chunks([b"thumbnail"], "png")
+        self.assertTrue(storage.commit_blob(path, file_hash, "png"))
+        self.assertFalse(os.path.exists(path))
+        self.assertTrue(storage.blob_exists(file_hash, "png"))
+
+        with storage.open_blob(file_hash, "png") as f:
+            self.assertEqual(f.read(), b"thumbnail")
+
+    def test_local_blob_is_a_temporary_copy(self):
+        with storage.local_blob(self.model1.file_hash) as path:
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), self.model_file)
+
+        self.assertFalse(os.path.exists(path))
+
+    def test_compress_blob(self):
+        path, file_hash = storage.stage_chunks([b"a" * 10000])
+        storage.commit_blob(path, file_hash)
+
+        storage.compress_blob(file_hash)
+        self.assertTrue(storage.blob_exists(file_hash, suffix=".gz"))
+        self.assertEqual(self.staged_files(), [])
+
+    @override_settings(MODEL_OPTIMIZER="cp {input} {output}")
+    def test_upload_process_and_delete(self):
+        created_model = self.upload()
+        self.assertIsNotNone(created_model)
+        self.assertTrue(storage.blob_exists(created_model.file_hash))
+
+        variant = ModelVariant.objects.get(model=created_model, name="optimized")
+        self.assertTrue(storage.blob_exists(variant.file_hash))
+        self.assertEqual(self.staged_files(), [])
+
+        database.delete(created_model.model_id)
+        # the other models share the file
+        self.assertTrue(storage.blob_exists(created_model.file_hash))
+
+    def test_get_model_streams_from_storage(self):
+        url = reverse("get_model", args=[self.model1.model_id])
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.model_file)
+
+        response = self.client.get(url, HTTP_RANGE="bytes=0-9")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), self.model_file[:10])
+
+
+@skipUnless(mock_aws, "boto3 and moto are needed for the object store tests")
+@override_settings(STORAGES=S3_STORAGES, MODEL_SERVING="redirect")
+class S3StorageTest(StorageTestMixin, BaseTestMixin, TestCase):
+    """Test cases for the S3-compatible object store, against a local stand-in."""
+
+    def setUp(self):
+        self.mock_aws = mock_aws()
+        self.mock_aws.start()
+        self.s3 = boto3.client("s3", region_name="us-east-1")
+        self.s3.create_bucket(Bucket=S3_BUCKET)
+        super().setUp()
+
+    def tearDown(self):
+        super().tearDown()
+        self.mock_aws.stop()
+
+    def test_get_model_redirects_to_presigned_url(self):
+        response = self.client.get(reverse("get_model", args=[self.model1.model_id]))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response["Cache-Control"], "no-store")
+        self.assertIn(storage.blob_name(self.model1.file_hash), response["Location"])
+        self.assertIn("Signature=", response["Location"])
+
+    def test_lod_redirects_to_its_own_file(self):
+        ModelVariant.objects.create(model=self.model1, name="lod1", file_hash="b" * 64, size=1)
+
+        response = self.client.get(reverse("get_model", args=[self.model1.model_id]), {"lod": 1})
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(storage.blob_name("b" * 64), response["Location"])
+
+    @override_settings(MODEL_THUMBNAILER="cp {input} {output}")
+    def test_upload_stores_in_bucket(self):
+        created_model = self.upload()
+        self.assertIsNotNone(created_model)
+
+        model_object = self.s3.head_object(Bucket=S3_BUCKET, Key=storage.blob_name(created_model.file_hash))
+        self.assertEqual(model_object["ContentType"], "model/gltf-binary")
+        self.assertEqual(model_object["ContentLength"], len(self.model_file))
+
+        thumbnail_object = self.s3.head_object(
+            Bucket=S3_BUCKET, Key=storage.blob_name(created_model.thumbnail_hash, "png"))
+        self.assertEqual(thumbnail_object["ContentType"], "image/png")
+        self.assertEqual(self.staged_files(), [])
@@ -0,0 +1,78 @@
+import hashlib
+import os
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+
+from .mixins import BaseViewTestMixin as BaseTestMixin
+from mainapp import storage
+from mainapp.models import Model
+from mainapp.uploadhandler import StagedUploadedFile
+from mainapp.utils import validate_glb_file
+
+
+class StagingFileUploadHandlerTest(BaseTestMixin, TestCase):
+    """Test cases for the upload handler writing model files to the staging directory."""
+
+    def staged_files(self):
+        directory = os.path.join(settings.MODEL_DIR, storage.STAGING_DIR)
+        return os.listdir(directory) if os.path.isdir(directory) else []
+
+    def upload_data(self):
+        return {
+            "title": "Staged Model",
+            "description": "This model is staged.",
+            "model_source": "self_created",
+            "license": "0",
+            "model_file": SimpleUploadedFile("test_model.glb", self.model_file, "model/gltf-binary"),
+        }
+
+    @patch("mainapp.forms.validate_glb_file")
+    def test_upload_is_staged_and_renamed_into_place(self, mock_validate):
+        staged = []
+
+        def validate(model_file):
+            self.assertIsInstance(model_file, StagedUploadedFile)
+            self.assertEqual(model_file.sha256, hashlib.sha256(self.model_file).hexdigest())
+            self.assertTrue(model_file.temporary_file_path().startswith(
+                os.path.join(settings.MODEL_DIR, storage.STAGING_DIR)))
+            staged.append(model_file.temporary_file_path())
+            return []
+        mock_validate.side_effect = validate
+
+        # a file that isn't stored yet
+        self.model_file += b"\0" * 4
+        response = self.client.post(reverse("upload"), data=self.upload_data())
+
+        created_model = Model.objects.get(title="Staged Model")
+        self.assertRedirects(response, reverse("model", args=[created_model.model_id, created_model.revision]))
+        self.assertEqual(created_model.file_hash, hashlib.sha256(self.model_file).hexdigest())
+        self.assertTrue(os.path.isfile(storage.blob_path(created_model.file_hash)))
+        self.assertFalse(os.path.exists(staged[0]))
+        self.assertEqual(self.staged_files(), [])
+
+    @patch("mainapp.forms.validate_glb_file")
+    def test_rejected_upload_is_removed(self, mock_validate):
+        mock_validate.return_value = [{"message": "Invalid", "pointer": "/"}]
+
+        response = self.client.post(reverse("upload"), data=self.upload_data())
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Model.objects.filter(title="Staged Model").exists())
+        self.assertEqual(self.staged_files(), [])
+
+    @patch("mainapp.utils.model_validator.subprocess.run")
+    def test_validator_reads_the_staged_file(self, mock_run):
+        mock_run.return_value.stdout = b'{"info": {"totalVertexCount": 3, "totalTriangleCount": 1}, "issues": {"numErrors": 0}}'
+
+        model_file = StagedUploadedFile("test_model.glb", "model/gltf-binary", 0, None)
+        model_file.write(self.model_file)
+        model_file.seek(0)
+
+        self.assertIsNone(validate_glb_file(model_file))
+        self.assertEqual(mock_run.call_args[0][0][1], model_file.temporary_file_path())
+
+        model_file.close()
+        self.assertFalse(os.path.exists(model_file.temporary_file_path()))
@@ -1,5 +1,23 @@
-from django.test import SimpleTestCase
+import gzip
+import io
+import json
+import os
+import struct
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
 from mainapp.utils import get_kv
+from mainapp.utils.compression import choose_encoding, compress_model
+from mainapp.utils.gltf import bounding_box, count_triangles, glb_triangle_count, prevalidate_glb, read_glb_json
+from mainapp.utils.model_validator import check_glb_file, run_validator
+from mainapp.utils.validator_pool import ValidatorPool, ValidatorTimeout
+
+VALIDATOR_SERVER = "{} mainapp/tests/test_files/validator_server.py".format(sys.executable)
 
 class TestUtils(SimpleTestCase):
     def test_tag_with_single_equality(self):
@@ -12,3 +30,194 @@ class TestUtils(SimpleTestCase):
 
         self.assertEqual(get_kv(tag_a), ["key", "value=value"])
         self.assertEqual(get_kv(tag_b), ["key", "value=val=v"])
+
+class TestCompression(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "1.glb")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_compress_model(self):
+        data = b"glTF" + bytes(4096)
+        with open(self.path, "wb") as f:
+            f.write(data)
+
+        compress_model(self.path)
+
+        with open(self.path + ".gz", "rb") as f:
+            self.assertEqual(gzip.decompress(f.read()), data)
+        self.assertFalse(os.path.exists(self.path + ".gz.tmp"))
+
+    def test_compress_model_incompressible(self):
+        with open(self.path, "wb") as f:
+            f.write(os.urandom(4096))
+
+        compress_model(self.path)
+
+        self.assertFalse(os.path.exists(self.path + ".gz"))
+
+    def test_choose_encoding(self):
+        with open(self.path + ".gz", "wb") as f:
+            f.write(b"")
+
+        self.assertEqual(choose_encoding("gzip, deflate, br", self.path), "gzip")
+        self.assertEqual(choose_encoding("*", self.path), "gzip")
+        self.assertIsNone(choose_encoding("gzip;q=0", self.path))
+        self.assertIsNone(choose_encoding("br", self.path))
+        self.assertIsNone(choose_encoding("", self.path))
+
+        with open(self.path + ".br", "wb") as f:
+            f.write(b"")
+
+        self.assertEqual(choose_encoding("gzip, br", self.path), "br")
+        self.assertEqual(choose_encoding("gzip, br;q=0.5", self.path), "gzip")
+
+class TestGltf(SimpleTestCase):
+    def test_glb_triangle_count(self):
+        self.assertEqual(glb_triangle_count("mainapp/tests/test_files/test_model.glb"), 26)
+
+    def test_read_glb_json_invalid(self):
+        for data in [b"", b"glTF", b"notglTF" + bytes(20), b"glTF" + bytes(20)]:
+            with self.assertRaises(ValueError):
+                read_glb_json(io.BytesIO(data))
+
+    def test_count_triangles(self):
+        gltf = {
+            "accessors": [{"count": 30}, {"count": 12}],
+            "meshes": [
+                {"primitives": [{"attributes": {"POSITION": 0}}]},
+                {"primitives": [{"attributes": {"POSITION": 0}, "indices": 1, "mode": 5}]},
+                {"primitives": [{"attributes": {"POSITION": 0}, "mode": 1}]},
+            ],
+        }
+        self.assertEqual(count_triangles(gltf), 10 + 10)
+
+        with self.assertRaises(ValueError):
+            count_triangles({"meshes": [{"primitives": [{"attributes": {"POSITION": 3}}]}]})
+
+    def test_bounding_box(self):
+        gltf = {
+            "accessors": [{"count": 3, "min": [0, 0, 0], "max": [1, 2, 3]}],
+            "meshes": [{"primitives": [{"attributes": {"POSITION": 0}}]}],
+            "nodes": [
+                {"mesh": 0, "scale": [2, 2, 2], "children": [1]},
+                # rotated a quarter turn around the y axis, and moved away
+                {"mesh": 0, "translation": [10, 0, 0], "rotation": [0, 0.7071068, 0, 0.7071068]},
+            ],
+        }
+        box = bounding_box(gltf)
+        self.assertEqual([round(length, 4) for length in box], [26, 4, 8])
+
+        self.assertIsNone(bounding_box({"nodes": [{}]}))
+
+        # nodes in a loop, or shared by several parents, aren't walked again
+        looped = dict(gltf, scenes=[{"nodes": [0]}], nodes=[{"mesh": 0, "children": [0]}])
+        self.assertIsNone(bounding_box(looped))
+        shared = dict(gltf, scenes=[{"nodes": [0]}], nodes=[{"children": [1, 1]}, {"mesh": 0}])
+        self.assertIsNone(bounding_box(shared))
+
+    def make_glb(self, gltf=None, bin_length=36, length=None):
+        # a triangle, its three positions in the BIN chunk
+        if gltf is None:
+            gltf = {
+                "asset": {"version": "2.0"},
+                "buffers": [{"byteLength": 36}],
+                "bufferViews": [{"buffer": 0, "byteLength": 36}],
+                "accessors": [{"bufferView": 0, "componentType": 5126, "type": "VEC3", "count": 3}],
+                "meshes": [{"primitives": [{"attributes": {"POSITION": 0}}]}],
+            }
+
+        data = json.dumps(gltf).encode("utf-8")
+        data += b" " * (-len(data) % 4)
+        chunks = struct.pack("<II", len(data), 0x4E4F534A) + data
+        if bin_length is not None:
+            chunks += struct.pack("<II", bin_length, 0x004E4942) + bytes(bin_length)
+
+        return struct.pack("<4sII", b"glTF", 2, length or 12 + len(chunks)) + chunks
+
+    def test_prevalidate_glb(self):
+        with open("mainapp/tests/test_files/test_model.glb", "rb") as f:
+            prevalidate_glb(f)
+
+        prevalidate_glb(io.BytesIO(self.make_glb()))
+
+    def test_prevalidate_glb_invalid(self):
+        valid = self.make_glb()
+        gltf = json.loads(valid[20:valid.index(b"BIN") - 4])
+        out_of_bounds_view = dict(gltf, bufferViews=[{"buffer": 0, "byteOffset": 4, "byteLength": 36}])
+        out_of_bounds_accessor = dict(gltf, accessors=[{"bufferView": 0, "componentType": 5126, "type": "VEC3", "count": 4}])
+        missing_view = dict(gltf, accessors=[{"bufferView": 1, "componentType": 5126, "type": "VEC3", "count": 3}])
+        points = dict(gltf, meshes=[{"primitives": [{"attributes": {"POSITION": 0}, "mode": 0}]}])
+        looped_nodes = dict(gltf, nodes=[{"mesh": 0, "children": [1]}, {"children": [0]}])
+        shared_node = dict(gltf, nodes=[{"children": [2]}, {"children": [2]}, {"mesh": 0}])
+        missing_node = dict(gltf, nodes=[{"children": [-1]}])
+
+        for data in [
+            valid[:-4],
+            valid + bytes(4),
+            self.make_glb(length=len(valid) + 4),
+            self.make_glb(bin_length=32),
+            self.make_glb(bin_length=None),
+            self.make_glb(bin_length=38),
+            self.make_glb(out_of_bounds_view),
+            self.make_glb(out_of_bounds_accessor),
+            self.make_glb(missing_view),
+            self.make_glb(points),
+            self.make_glb(looped_nodes),
+            self.make_glb(shared_node),
+            self.make_glb(missing_node),
+        ]:
+            with self.assertRaises(ValueError):
+                prevalidate_glb(io.BytesIO(data))
+
+    def test_check_glb_file(self):
+        with self.assertRaisesMessage(ValidationError, "Buffer 0 is longer than the BIN chunk of the GLB file."):
+            check_glb_file(SimpleUploadedFile("model.glb", self.make_glb(bin_length=32)))
+
+class TestValidatorPool(SimpleTestCase):
+    def setUp(self):
+        self.pool = ValidatorPool(VALIDATOR_SERVER, 2, 5)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_processes_are_reused(self):
+        first = self.pool.validate("1.glb")
+        second = self.pool.validate("2.glb")
+
+        self.assertEqual(first["info"]["totalTriangleCount"], 12)
+        self.assertEqual(first["pid"], second["pid"])
+
+    def test_concurrency_is_limited(self):
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            reports = list(executor.map(self.pool.validate, ["{}.glb".format(i) for i in range(12)]))
+
+        self.assertLessEqual(len({report["pid"] for report in reports}), 2)
+
+    def test_failed_processes_are_replaced(self):
+        pid = self.pool.validate("1.glb")["pid"]
+
+        self.pool.timeout = 0.5
+        with self.assertRaises(ValidatorTimeout):
+            self.pool.validate("slow.glb")
+        with self.assertRaises(OSError):
+            self.pool.validate("exit.glb")
+
+        self.assertNotEqual(self.pool.validate("2.glb")["pid"], pid)
+
+    @override_settings(GLTF_VALIDATOR_SERVER=VALIDATOR_SERVER, GLTF_VALIDATOR_TIMEOUT=1)
+    def test_run_validator_uses_pool(self):
+        self.assertIn("pid", run_validator("1.glb"))
+
+        with self.assertRaisesMessage(ValidationError, "Validating the file took too long."):
+            run_validator("slow.glb")
+
+    @override_settings(GLTF_VALIDATOR_SERVER="/nonexistent/validator_server")
+    @patch("mainapp.utils.model_validator.subprocess.run")
+    def test_run_validator_falls_back_to_cli(self, mock_run):
+        mock_run.return_value.stdout = b'{"info": {}}'
+
+        self.assertEqual(run_validator("1.glb"), {"info": {}})
+        self.assertEqual(mock_run.call_args[0][0][1], "1.glb")
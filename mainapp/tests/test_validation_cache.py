@@ -0,0 +1,61 @@
+import hashlib
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+
+from .mixins import BaseViewTestMixin as BaseTestMixin
+from mainapp import ingest
+from mainapp.models import ValidationReport
+from mainapp.utils import validate_glb_file
+
+REPORT = b'{"info": {"totalVertexCount": 3, "totalTriangleCount": 1}, "issues": {"numErrors": 0}}'
+
+
+@patch("mainapp.utils.model_validator.subprocess.run")
+class ValidationCacheTest(BaseTestMixin, TestCase):
+    """Test cases for the validation reports cached by the hash of the files."""
+
+    def test_same_file_is_validated_once(self, mock_run):
+        mock_run.return_value.stdout = REPORT
+
+        for _ in range(2):
+            model_file = SimpleUploadedFile("test_model.glb", self.model_file, "model/gltf-binary")
+            self.assertIsNone(validate_glb_file(model_file))
+
+        mock_run.assert_called_once()
+        report = ValidationReport.objects.get(file_hash=hashlib.sha256(self.model_file).hexdigest())
+        self.assertEqual(report.report["info"]["totalTriangleCount"], 1)
+
+    def test_cached_errors_are_reported(self, mock_run):
+        ValidationReport.objects.create(file_hash=hashlib.sha256(self.model_file).hexdigest(), report={
+            "info": {"totalVertexCount": 3, "totalTriangleCount": 1},
+            "issues": {"numErrors": 1, "messages": [{"severity": 0, "message": "Invalid accessor."}]},
+        })
+
+        model_file = SimpleUploadedFile("test_model.glb", self.model_file, "model/gltf-binary")
+        self.assertEqual(validate_glb_file(model_file), [{"message": "Invalid accessor.", "pointer": "N/A"}])
+        mock_run.assert_not_called()
+
+    def test_ingest_reuses_the_report(self, mock_run):
+        mock_run.return_value.stdout = REPORT
+
+        self.assertIsNone(ingest.validate(self.model1))
+        self.assertIsNone(ingest.validate(self.model2))
+        mock_run.assert_called_once()
+
+    def test_cache_validations_command(self, mock_run):
+        mock_run.return_value.stdout = REPORT
+
+        out = StringIO()
+        call_command("cache_validations", stdout=out)
+        self.assertIn("Cached the validation reports of 1 model files.", out.getvalue())
+        self.assertTrue(ValidationReport.objects.filter(file_hash=self.model1.file_hash).exists())
+
+        call_command("cache_validations", stdout=StringIO())
+        mock_run.assert_called_once()
+
+        call_command("cache_validations", "--force", stdout=StringIO())
+        self.assertEqual(mock_run.call_count, 2)
@@ -25,6 +25,17 @@ class IndexViewTest(BaseViewTestMixin, TestCase):
         self.assertIn(self.model3, models)
         self.assertNotIn(self.model2, models)
 
+    def test_index_view_thumbnails(self):
+        self.model1.thumbnail_hash = "c" * 64
+        self.model1.save()
+        response = self.client.get(reverse("index"))
+
+        thumbnail_url = reverse("get_thumbnail", args=[self.model1.model_id, self.model1.revision])
+        self.assertContains(response, f'src="{thumbnail_url}"')
+        # only the models without a thumbnail are loaded with the page
+        self.assertNotContains(response, f'href="/api/model/{self.model1.model_id}/{self.model1.revision}"')
+        self.assertContains(response, f'href="/api/model/{self.model3.model_id}/{self.model3.revision}"')
+
     def test_index_view_get_authenticated_user(self):
         self.login_user(user_type="user")  # Assuming this uses self.user
         response = self.client.get(reverse("index"))
@@ -165,7 +165,40 @@ class ModelViewTests(BaseViewTestMixin, TestCase):
         self.assertEqual(response.context["model"].pk, self.visible_model.pk)
         self.assertContains(response, self.visible_model.title)
 
-    def test_model_view_hidden_model_non_admin(self):
+    def test_model_view_ready_revision_preloads_the_model(self):
+        response = self.client.get(reverse("model", args=[self.visible_model.model_id]))
+        self.assertContains(response, 'rel="preload"')
+        self.assertContains(response, 'class="render-pane"')
+
+    def test_model_view_stats(self):
+        response = self.client.get(reverse("model", args=[self.visible_model.model_id]))
+        self.assertIsNone(response.context["model_stats"])
+        self.assertContains(response, "setUpStats();")
+
+        self.visible_model.stats = {
+            "faces": 12000, "meshes": 2, "materials": 1, "textures": 0, "pbr_textures": 0,
+            "animations": 0, "bounding_box": [10, 20, 5], "size": 2048,
+        }
+        self.visible_model.save()
+
+        response = self.client.get(reverse("model", args=[self.visible_model.model_id]))
+        self.assertNotContains(response, "setUpStats();")
+        self.assertContains(response, '<span id="faceCount" class="text-warning">12,000</span>', html=True)
+        self.assertContains(response, "12.00 triangles/m")
+        self.assertContains(response, "10.00m × 20.00m × 5.00m")
+        self.assertContains(response, "2.0\xa0KB")
+
+    def test_model_view_stats_without_bounding_box(self):
+        self.visible_model.stats = {
+            "faces": 12, "meshes": 1, "materials": 1, "textures": 0, "pbr_textures": 0,
+            "animations": 0, "bounding_box": None, "size": 2048,
+        }
+        self.visible_model.save()
+
+        response = self.client.get(reverse("model", args=[self.visible_model.model_id]))
+        self.assertContains(response, '<span id="boundingBox" class="text-muted">-</span>', html=True)
+        self.assertContains(response, '<span id="triangleDensity" class="text-muted">-</span>', html=True)
+
         response = self.client.get(reverse("model", args=[self.hidden_model.model_id]))
         self.assertEqual(response.status_code, 404)
 
@@ -66,6 +66,29 @@ class SearchViewTest(BaseViewTestMixin, TestCase):
         self.assertEqual(len(page1.context["models"]), 6)
         self.assertEqual(len(page2.context["models"]), 4)
 
+    def test_search_prefix_and_description_ranked(self):
+        in_description = Model.objects.create(
+            model_id=4,
+            revision=1,
+            title="Landmark",
+            description="A model of the Eiffel Tower",
+            author=self.user,
+            license=0,
+            latest=True,
+        )
+        in_title = Model.objects.create(
+            model_id=5,
+            revision=1,
+            title="Eiffel Tower",
+            author=self.user,
+            license=0,
+            latest=True,
+        )
+
+        response = self.client.get(reverse("search"), {"query": "eiff tow"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["models"]), [in_title, in_description])
+
     def test_search_no_results(self):
         response = self.client.get(reverse("search"), {"query": "nohits"})
         self.assertEqual(response.status_code, 200)
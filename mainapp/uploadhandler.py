@@ -0,0 +1,66 @@
+import os
+import hashlib
+
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers
+
+from . import storage
+
+# The form field of the uploaded model files, see mainapp.forms
+MODEL_FIELD_NAME = 'model_file'
+
+# An uploaded model file, written to the staging directory of the model storage.
+# It is removed when closed, unless it was stored in the meantime.
+class StagedUploadedFile(UploadedFile):
+    def __init__(self, name, content_type, size, charset, content_type_extra=None):
+        path = storage.staging_path()
+        super().__init__(open(path, 'w+b'), name, content_type, size, charset, content_type_extra)
+        # the SHA-256 of the contents, set once the upload is complete
+        self.sha256 = None
+
+    def temporary_file_path(self):
+        return self.file.name
+
+    def close(self):
+        try:
+            return self.file.close()
+        finally:
+            try:
+                os.remove(self.file.name)
+            except FileNotFoundError:
+                # the file was stored
+                pass
+
+# Writes uploaded model files to the staging directory while they are received,
+# hashing them on the way. Their path is validated, and renamed into place when
+# the model is stored, instead of copying them from a temporary file each time.
+class StagingFileUploadHandler(FileUploadHandler):
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.activated = field_name == MODEL_FIELD_NAME
+
+        if self.activated:
+            self.file = StagedUploadedFile(
+                self.file_name, self.content_type, 0, self.charset, self.content_type_extra)
+            self.hash = hashlib.sha256()
+            raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.activated:
+            return raw_data
+
+        self.file.write(raw_data)
+        self.hash.update(raw_data)
+
+    def file_complete(self, file_size):
+        if not self.activated:
+            return None
+
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.sha256 = self.hash.hexdigest()
+        return self.file
+
+    def upload_interrupted(self):
+        if getattr(self, 'activated', False):
+            self.file.close()
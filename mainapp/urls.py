@@ -22,10 +22,13 @@ urlpatterns = [
     re_path(r'^action/hide_model$', views.hide_model, name='hide_model'),
     re_path(r'^action/delete_model$', views.delete_model, name='delete_model'),
 
+    re_path(r'^api/info$', api.get_info_batch, name='get_info_batch'),
     re_path(r'^api/info/(?P<model_id>[0-9]+)$', api.get_info, name='get_info'),
 
     re_path(r'^api/model/(?P<model_id>[0-9]+)/(?P<revision>[0-9]+)$', api.get_model, name='get_model'),
     re_path(r'^api/model/(?P<model_id>[0-9]+)$', api.get_model, name='get_model'),
+    re_path(r'^api/thumbnail/(?P<model_id>[0-9]+)/(?P<revision>[0-9]+)$', api.get_thumbnail, name='get_thumbnail'),
+    re_path(r'^api/thumbnail/(?P<model_id>[0-9]+)$', api.get_thumbnail, name='get_thumbnail'),
 
     re_path(r'^api/tag/(?P<tag>.*)/(?P<page_id>[0-9]+)$', api.lookup_tag, name='lookup_tag'),
     re_path(r'^api/tag/(?P<tag>.*)$', api.lookup_tag, name='lookup_tag'),
@@ -36,6 +39,9 @@ urlpatterns = [
 
     re_path(r'^api/search/?(?P<latitude>-?[0-9]+(\.[0-9]+)?)/(?P<longitude>-?[0-9]+(\.[0-9]+)?)/(?P<distance>[0-9]+(\.[0-9]+)?)/(?P<page_id>[0-9]+)$', api.search_range, name='lookup_range'),
     re_path(r'^api/search/(?P<latitude>-?[0-9]+(\.[0-9]+)?)/(?P<longitude>-?[0-9]+(\.[0-9]+)?)/(?P<distance>[0-9]+(\.[0-9]+)?)$', api.search_range, name='lookup_range'),
+    re_path(r'^api/nearest/(?P<latitude>-?[0-9]+(\.[0-9]+)?)/(?P<longitude>-?[0-9]+(\.[0-9]+)?)/(?P<count>[0-9]+)$', api.search_nearest, name='search_nearest'),
+    re_path(r'^api/map/clusters/(?P<zoom>[0-9]+)/(?P<x>[0-9]+)/(?P<y>[0-9]+)$', api.map_clusters, name='map_clusters'),
+    re_path(r'^api/map/(?P<zoom>[0-9]+)/(?P<x>[0-9]+)/(?P<y>[0-9]+)$', api.map_tile, name='map_tile'),
     re_path(r'^api/search/title/(?P<title>.*)/(?P<page_id>[0-9]+)$', api.search_title, name='search_title'),
     re_path(r'^api/search/title/(?P<title>.*)$', api.search_title, name='search_title'),
     re_path(r'^api/search/full$', api.search_full, name='search_full'),
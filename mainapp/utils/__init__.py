@@ -1,7 +1,12 @@
+import re
+import hashlib
+
 from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F
 from django.utils.safestring import mark_safe
 
-from .model_validator import validate_glb_file
+from .model_validator import check_glb_file, validate_glb_file
 
 # Gets the key and value of an OSM tag from a string
 # Note: any extra '=' chars other than the first will be included in the value.
@@ -14,6 +19,31 @@ def update_last_page(request):
 def get_last_page(request):
     return request.session['last_page']
 
+# Filters the models with words starting with every word of a search query,
+# using the full text search index, and annotates them with their rank.
+# With title_only, only the words of the title are matched.
+def text_filter(models, query, title_only=False):
+    words = re.findall(r'\w+', query)
+    if not words:
+        return models.none()
+
+    # the A weight is given to the words of the title
+    suffix = ':*A' if title_only else ':*'
+    search_query = SearchQuery(
+        ' & '.join(word + suffix for word in words), search_type='raw', config='simple')
+
+    return models.filter(search_vector=search_query) \
+        .annotate(rank=SearchRank(F('search_vector'), search_query))
+
+# Returns the hex SHA-256 of a file, reading it in chunks
+def hash_file(path):
+    file_hash = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            file_hash.update(chunk)
+
+    return file_hash.hexdigest()
+
 # Checks that the user that made a request is an admin
 def admin(request):
     return request.user.is_authenticated and request.user.profile.is_admin
@@ -0,0 +1,86 @@
+import os
+import gzip
+import shutil
+import logging
+
+try:
+    import brotli
+except ImportError: # brotli variants are only written when the package is installed
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# The suffixes of the precompressed variants of model files, by their content encoding,
+# in order of preference
+ENCODINGS = {
+    'br': '.br',
+    'gzip': '.gz',
+}
+
+# Variants that don't save at least this fraction of the size aren't kept,
+# as their textures are usually already compressed
+MIN_SAVING = 0.1
+
+def compress_brotli(source, destination):
+    compressor = brotli.Compressor(quality=9)
+    for chunk in iter(lambda: source.read(64 * 1024), b''):
+        destination.write(compressor.process(chunk))
+    destination.write(compressor.finish())
+
+def compress_gzip(source, destination):
+    # mtime=0 makes the variant only depend on the file
+    with gzip.GzipFile(fileobj=destination, mode='wb', compresslevel=9, mtime=0) as compressed:
+        shutil.copyfileobj(source, compressed)
+
+COMPRESSORS = {
+    'br': compress_brotli,
+    'gzip': compress_gzip,
+}
+
+# Returns the encodings that variants can be written for
+def available_encodings():
+    return [encoding for encoding in ENCODINGS if encoding != 'br' or brotli is not None]
+
+# Writes the precompressed variants of a model file next to it, keeping the ones
+# that are worth it. Existing variants are rewritten.
+def compress_model(path):
+    size = os.path.getsize(path)
+
+    for encoding in available_encodings():
+        variant_path = path + ENCODINGS[encoding]
+        # written under a temporary name, so an incomplete variant is never served
+        temporary_path = variant_path + '.tmp'
+        with open(path, 'rb') as source, open(temporary_path, 'wb') as destination:
+            COMPRESSORS[encoding](source, destination)
+
+        if os.path.getsize(temporary_path) <= size * (1 - MIN_SAVING):
+            os.replace(temporary_path, variant_path)
+        else:
+            os.remove(temporary_path)
+            if os.path.isfile(variant_path):
+                os.remove(variant_path)
+
+# Picks the content encoding of the variant to send for an Accept-Encoding header,
+# out of the existing variants of a model file, or returns None for the file itself.
+# Whether a variant exists is checked with exists, which is given the path of the variant.
+def choose_encoding(accept_encoding, path, exists=os.path.isfile):
+    accepted = {}
+    for coding in accept_encoding.split(','):
+        name, _, params = coding.partition(';')
+        name = name.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        accepted[name] = quality
+
+    best, best_quality = None, 0
+    for encoding, suffix in ENCODINGS.items():
+        quality = accepted.get(encoding, accepted.get('*', 0))
+        if quality > best_quality and exists(path + suffix):
+            best, best_quality = encoding, quality
+
+    return best
@@ -0,0 +1,425 @@
+import os
+import json
+import math
+import struct
+import itertools
+
+GLB_MAGIC = b'glTF'
+GLB_HEADER = struct.Struct('<4sII') # magic, version, length
+CHUNK_HEADER = struct.Struct('<II') # length, type
+JSON_CHUNK_TYPE = 0x4E4F534A # 'JSON'
+BIN_CHUNK_TYPE = 0x004E4942 # 'BIN\0'
+
+# Primitive modes, with a function giving the number of triangles of a primitive
+# from its number of vertices. Points and lines have none.
+TRIANGLES, TRIANGLE_STRIP, TRIANGLE_FAN = 4, 5, 6
+TRIANGLE_COUNTS = {
+    TRIANGLES: lambda count: count // 3,
+    TRIANGLE_STRIP: lambda count: max(count - 2, 0),
+    TRIANGLE_FAN: lambda count: max(count - 2, 0),
+}
+
+# The sizes in bytes of the component types of accessors, and their numbers of components by type
+COMPONENT_SIZES = {5120: 1, 5121: 1, 5122: 2, 5123: 2, 5125: 4, 5126: 4}
+TYPE_COMPONENTS = {'SCALAR': 1, 'VEC2': 2, 'VEC3': 3, 'VEC4': 4, 'MAT2': 4, 'MAT3': 9, 'MAT4': 16}
+
+# The most nodes walked to find the bounding box of a glTF
+MAX_NODES = 20000
+
+# The textures of the clearcoat extension of materials, counted as PBR textures
+PBR_CLEARCOAT_TEXTURES = ['clearcoatTexture', 'clearcoatRoughnessTexture', 'clearcoatNormalTexture']
+
+
+def read_glb_json(f):
+    """
+    Reads the JSON chunk of a GLB file, without reading its binary chunk.
+
+    Raises:
+        ValueError: if the file is not a GLB file, or its JSON chunk is invalid.
+
+    Returns:
+        dict: The glTF JSON of the file.
+    """
+
+    header = f.read(GLB_HEADER.size)
+    if len(header) < GLB_HEADER.size:
+        raise ValueError('The file is too short to be a GLB file.')
+
+    magic, version, length = GLB_HEADER.unpack(header)
+    if magic != GLB_MAGIC:
+        raise ValueError('The file is not a GLB file.')
+    if version != 2:
+        raise ValueError('Only version 2 GLB files are supported.')
+
+    chunk_header = f.read(CHUNK_HEADER.size)
+    if len(chunk_header) < CHUNK_HEADER.size:
+        raise ValueError('The GLB file has no JSON chunk.')
+
+    chunk_length, chunk_type = CHUNK_HEADER.unpack(chunk_header)
+    if chunk_type != JSON_CHUNK_TYPE:
+        raise ValueError('The first chunk of the GLB file is not a JSON chunk.')
+    if GLB_HEADER.size + CHUNK_HEADER.size + chunk_length > length:
+        raise ValueError('The JSON chunk is longer than the GLB file.')
+
+    chunk = f.read(chunk_length)
+    if len(chunk) < chunk_length:
+        raise ValueError('The GLB file is truncated.')
+
+    try:
+        gltf = json.loads(chunk.decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError('The JSON chunk of the GLB file is invalid.')
+
+    if not isinstance(gltf, dict):
+        raise ValueError('The JSON chunk of the GLB file is invalid.')
+
+    return gltf
+
+
+def count_triangles(gltf):
+    """
+    Counts the triangles of the meshes of a glTF, once per mesh like gltf-validator.
+
+    Raises:
+        ValueError: if a primitive refers to an accessor that doesn't exist.
+    """
+
+    accessors = gltf.get('accessors', [])
+    triangles = 0
+
+    try:
+        for mesh in gltf.get('meshes', []):
+            for primitive in mesh.get('primitives', []):
+                count_triangles_of_mode = TRIANGLE_COUNTS.get(primitive.get('mode', TRIANGLES))
+                if count_triangles_of_mode is None:
+                    continue
+
+                # indexed primitives are drawn from their indices, others from their positions
+                if 'indices' in primitive:
+                    accessor = accessors[primitive['indices']]
+                else:
+                    accessor = accessors[primitive['attributes']['POSITION']]
+
+                triangles += count_triangles_of_mode(accessor['count'])
+    except (AttributeError, IndexError, KeyError, TypeError):
+        raise ValueError('A primitive of the glTF refers to an invalid accessor.')
+
+    return triangles
+
+
+def glb_triangle_count(path):
+    """
+    Returns the number of triangles of a GLB file, or None if it can't be read.
+    """
+
+    try:
+        with open(path, 'rb') as f:
+            return count_triangles(read_glb_json(f))
+    except (OSError, ValueError):
+        return None
+
+
+def node_matrix(node):
+    """
+    Returns the local transform of a glTF node, as the first three rows of its matrix.
+    """
+
+    if 'matrix' in node:
+        # stored in column-major order
+        m = node['matrix']
+        return [[m[column * 4 + row] for column in range(4)] for row in range(3)]
+
+    tx, ty, tz = node.get('translation', [0, 0, 0])
+    x, y, z, w = node.get('rotation', [0, 0, 0, 1])
+    sx, sy, sz = node.get('scale', [1, 1, 1])
+
+    return [
+        [(1 - 2 * (y * y + z * z)) * sx, 2 * (x * y - z * w) * sy, 2 * (x * z + y * w) * sz, tx],
+        [2 * (x * y + z * w) * sx, (1 - 2 * (x * x + z * z)) * sy, 2 * (y * z - x * w) * sz, ty],
+        [2 * (x * z - y * w) * sx, 2 * (y * z + x * w) * sy, (1 - 2 * (x * x + y * y)) * sz, tz],
+    ]
+
+
+def multiply(a, b):
+    """
+    Returns the product of two affine transforms, given as the first three rows of their matrices.
+    """
+
+    return [
+        [sum(a[row][k] * b[k][column] for k in range(3)) + (a[row][3] if column == 3 else 0)
+            for column in range(4)]
+        for row in range(3)
+    ]
+
+
+def bounding_box(gltf):
+    """
+    Returns the width, height and depth of the box bounding the meshes of the
+    default scene of a glTF, from the bounds of their positions, or None if it
+    has no mesh, if its nodes don't form trees, or if it has more than MAX_NODES.
+    """
+
+    accessors = gltf.get('accessors', [])
+    meshes = gltf.get('meshes', [])
+    nodes = gltf.get('nodes', [])
+    scenes = gltf.get('scenes', [])
+
+    if scenes:
+        roots = scenes[gltf.get('scene', 0)].get('nodes', [])
+    else:
+        children = {child for node in nodes for child in node.get('children', [])}
+        roots = [index for index in range(len(nodes)) if index not in children]
+
+    identity = [[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0]]
+    low, high = [math.inf] * 3, [-math.inf] * 3
+    stack = [(root, identity) for root in roots]
+    visited = set()
+
+    while stack:
+        index, parent = stack.pop()
+        # a node reached twice is in a loop, or has several parents
+        if index in visited or len(visited) >= MAX_NODES:
+            return None
+        visited.add(index)
+
+        node = nodes[index]
+        matrix = multiply(parent, node_matrix(node))
+
+        if 'mesh' in node:
+            for primitive in meshes[node['mesh']].get('primitives', []):
+                accessor = accessors[primitive['attributes']['POSITION']]
+                # the corners of the bounds of the positions, transformed
+                for corner in itertools.product(*zip(accessor['min'], accessor['max'])):
+                    for axis in range(3):
+                        value = sum(matrix[axis][k] * corner[k] for k in range(3)) + matrix[axis][3]
+                        low[axis] = min(low[axis], value)
+                        high[axis] = max(high[axis], value)
+
+        stack.extend((child, matrix) for child in node.get('children', []))
+
+    if low[0] == math.inf:
+        return None
+
+    return [high[axis] - low[axis] for axis in range(3)]
+
+
+def count_pbr_textures(gltf):
+    """
+    Counts the textures used by the materials of a glTF for their physically
+    based properties, rather than for their base color.
+    """
+
+    textures = set()
+    for material in gltf.get('materials', []):
+        slots = [
+            material.get('pbrMetallicRoughness', {}).get('metallicRoughnessTexture'),
+            material.get('normalTexture'),
+            material.get('occlusionTexture'),
+            material.get('emissiveTexture'),
+        ]
+        clearcoat = material.get('extensions', {}).get('KHR_materials_clearcoat', {})
+        slots += [clearcoat.get(name) for name in PBR_CLEARCOAT_TEXTURES]
+
+        textures.update(slot['index'] for slot in slots if slot is not None)
+
+    return len(textures)
+
+
+def glb_stats(path):
+    """
+    Returns the statistics of a GLB file shown on its page, from its JSON chunk,
+    or None if it can't be read.
+
+    Returns:
+        dict: The number of faces (triangles), meshes, materials, textures,
+              PBR textures and animations of the file, the width, height and
+              depth of its bounding box or None, and its size in bytes.
+    """
+
+    try:
+        with open(path, 'rb') as f:
+            gltf = read_glb_json(f)
+
+        return {
+            'faces': count_triangles(gltf),
+            'meshes': len(gltf.get('meshes', [])),
+            'materials': len(gltf.get('materials', [])),
+            'textures': len(gltf.get('textures', [])),
+            'pbr_textures': count_pbr_textures(gltf),
+            'animations': len(gltf.get('animations', [])),
+            'bounding_box': bounding_box(gltf),
+            'size': os.path.getsize(path),
+        }
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError, OSError):
+        return None
+
+
+def count_vertices(gltf):
+    """
+    Counts the vertices of the meshes of a glTF, once per mesh like count_triangles.
+
+    Raises:
+        ValueError: if a primitive refers to an accessor that doesn't exist.
+    """
+
+    accessors = gltf.get('accessors', [])
+    vertices = 0
+
+    try:
+        for mesh in gltf.get('meshes', []):
+            for primitive in mesh.get('primitives', []):
+                vertices += accessors[primitive['attributes']['POSITION']]['count']
+    except (AttributeError, IndexError, KeyError, TypeError):
+        raise ValueError('A primitive of the glTF refers to an invalid accessor.')
+
+    return vertices
+
+
+def read_glb_chunks(f):
+    """
+    Reads the JSON chunk of a GLB file, and only the headers of its other
+    chunks, checking that they fill the file as it declares.
+
+    Raises:
+        ValueError: if the chunks of the file are invalid.
+
+    Returns:
+        tuple: The glTF JSON of the file, and the length of its BIN chunk, or None.
+    """
+
+    f.seek(0)
+    gltf = read_glb_json(f)
+
+    size = f.seek(0, os.SEEK_END)
+    f.seek(0)
+    _, _, length = GLB_HEADER.unpack(f.read(GLB_HEADER.size))
+    if length != size:
+        raise ValueError('The length declared by the GLB file does not match its size.')
+
+    json_length, _ = CHUNK_HEADER.unpack(f.read(CHUNK_HEADER.size))
+    offset = GLB_HEADER.size + CHUNK_HEADER.size + json_length
+    bin_length = None
+    chunk_index = 1
+
+    while offset < length:
+        # the contents of the chunks are skipped over, and never read
+        f.seek(offset)
+        chunk_header = f.read(CHUNK_HEADER.size)
+        if len(chunk_header) < CHUNK_HEADER.size:
+            raise ValueError('The GLB file ends inside of a chunk header.')
+
+        chunk_length, chunk_type = CHUNK_HEADER.unpack(chunk_header)
+        offset += CHUNK_HEADER.size + chunk_length
+        if offset > length:
+            raise ValueError('A chunk of the GLB file is longer than the file.')
+
+        if chunk_type == BIN_CHUNK_TYPE:
+            if chunk_index != 1:
+                raise ValueError('The BIN chunk of the GLB file must follow its JSON chunk.')
+            bin_length = chunk_length
+        elif chunk_type == JSON_CHUNK_TYPE:
+            raise ValueError('The GLB file has more than one JSON chunk.')
+        chunk_index += 1
+
+    if any(chunk_length % 4 for chunk_length in (json_length, bin_length or 0)):
+        raise ValueError('The chunks of the GLB file are not aligned to 4 bytes.')
+
+    return gltf, bin_length
+
+
+def check_bounds(gltf, bin_length):
+    """
+    Checks that the buffer views of a glTF lie within their buffers, and its
+    accessors within their buffer views, the buffer of the BIN chunk being
+    bin_length long.
+
+    Raises:
+        ValueError: if a buffer, buffer view or accessor is out of bounds.
+    """
+
+    buffer_lengths = []
+    for index, buffer in enumerate(gltf.get('buffers', [])):
+        # the first buffer can be the BIN chunk, the others are resources
+        if 'uri' not in buffer and (index != 0 or bin_length is None or buffer['byteLength'] > bin_length):
+            raise ValueError('Buffer {} is longer than the BIN chunk of the GLB file.'.format(index))
+        buffer_lengths.append(buffer['byteLength'])
+
+    view_lengths = []
+    for index, view in enumerate(gltf.get('bufferViews', [])):
+        if view.get('byteOffset', 0) + view['byteLength'] > buffer_lengths[view['buffer']]:
+            raise ValueError('Buffer view {} is out of the bounds of its buffer.'.format(index))
+        view_lengths.append(view['byteLength'])
+
+    views = gltf.get('bufferViews', [])
+    for index, accessor in enumerate(gltf.get('accessors', [])):
+        if accessor['count'] < 1:
+            raise ValueError('Accessor {} has no elements.'.format(index))
+        # accessors without a buffer view are zeros, or sparse
+        if 'bufferView' not in accessor:
+            continue
+
+        element_size = COMPONENT_SIZES[accessor['componentType']] * TYPE_COMPONENTS[accessor['type']]
+        stride = views[accessor['bufferView']].get('byteStride', element_size)
+        end = accessor.get('byteOffset', 0) + stride * (accessor['count'] - 1) + element_size
+        if end > view_lengths[accessor['bufferView']]:
+            raise ValueError('Accessor {} is out of the bounds of its buffer view.'.format(index))
+
+
+def check_nodes(gltf):
+    """
+    Checks that the nodes of a glTF form trees, as the specification requires:
+    that their children exist, and that no node has several parents, nor is
+    its own ancestor.
+
+    Raises:
+        ValueError: if the nodes don't form trees.
+    """
+
+    nodes = gltf.get('nodes', [])
+    parents = {}
+    for index, node in enumerate(nodes):
+        for child in node.get('children', []):
+            if not isinstance(child, int) or not 0 <= child < len(nodes):
+                raise ValueError('Node {} has a child that does not exist.'.format(index))
+            if child in parents:
+                raise ValueError('Node {} has more than one parent.'.format(child))
+            parents[child] = index
+
+    # with a parent each at most, the ancestors of a node are a single path
+    settled = set()
+    for index in range(len(nodes)):
+        path = set()
+        while index is not None and index not in settled:
+            if index in path:
+                raise ValueError('Node {} is its own ancestor.'.format(index))
+            path.add(index)
+            index = parents.get(index)
+        settled.update(path)
+
+
+def prevalidate_glb(f):
+    """
+    Checks the structure of a GLB file before it is validated
+    by gltf-validator, without reading its binary chunk: the layout of its chunks,
+    the bounds of its buffer views and accessors, that its nodes form trees, and
+    that it has some shape.
+
+    Raises:
+        ValueError: describing the first problem found.
+    """
+
+    gltf, bin_length = read_glb_chunks(f)
+
+    try:
+        check_bounds(gltf, bin_length)
+    except (AttributeError, IndexError, KeyError, TypeError):
+        raise ValueError('The buffers, buffer views or accessors of the glTF are invalid.')
+
+    try:
+        check_nodes(gltf)
+    except (AttributeError, TypeError):
+        raise ValueError('The nodes of the glTF are invalid.')
+
+    # at least a triangle, like the check of the gltf-validator report
+    if count_vertices(gltf) < 3 or count_triangles(gltf) < 1:
+        raise ValueError('GLB file must have some valid shape.')
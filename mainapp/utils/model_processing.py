@@ -0,0 +1,48 @@
+import os
+import shlex
+import logging
+import subprocess
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def run_model_command(command, **placeholders):
+    """
+    Runs a command line of a local model processing tool, such as gltf-transform.
+
+    The {input} and {output} placeholders of the command line are replaced by
+    the paths of the files, and any other by the given keyword arguments.
+
+    Returns:
+        bool: True if the command succeeded and wrote its output file.
+    """
+
+    arguments = [
+        argument.format(**{name: str(value) for name, value in placeholders.items()})
+        for argument in shlex.split(command)
+    ]
+
+    try:
+        result = subprocess.run(
+            arguments,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=settings.MODEL_PROCESSING_TIMEOUT,
+        )
+    except FileNotFoundError:
+        logger.exception(f"Model processing command not found: {arguments[0]}.")
+        return False
+    except subprocess.TimeoutExpired:
+        logger.error(f"Model processing command timed out: {command}.")
+        return False
+
+    if result.returncode != 0:
+        logger.error(
+            f"Model processing command failed with code {result.returncode}: "
+            f"{result.stderr.decode('utf-8', errors='replace')}"
+        )
+        return False
+
+    return os.path.isfile(placeholders['output'])
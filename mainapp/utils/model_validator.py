@@ -1,25 +1,29 @@
 import json
+import hashlib
 import logging
 import subprocess
 import tempfile
 
+from django.apps import apps
 from django.conf import settings
 from django.core.exceptions import ValidationError
 
+from .gltf import prevalidate_glb
+from .validator_pool import ValidatorBusy, ValidatorTimeout, get_validator_pool
+
 logger = logging.getLogger(__name__)
 
+# The code of the validation errors caused by the server rather than the file
+INTERNAL_ERROR = "internal_error"
 
-def validate_glb_file(file_field):
+
+def check_glb_file(file_field):
     """
-    Validates a GLB file using the Khronos Group's gltf-validator CLI.
+    Checks the name of an uploaded GLB file and the structure of its chunks, buffers
+    and accessors, without reading its binary chunk nor validating it.
 
     Raises:
-        ValidationError: for file type errors or internal server errors.
-
-    Returns:
-        list: A list of error dictionaries if GLB validation fails. Each dictionary
-              contains 'message' and 'pointer' keys.
-        None: if the file is valid.
+        ValidationError: if the file is not a GLB file, or is malformed.
     """
 
     if not file_field.name.lower().endswith(".glb"):
@@ -32,47 +36,163 @@ def validate_glb_file(file_field):
             "The uploaded file does not appear to be a valid GLB file."
         )
 
+    try:
+        prevalidate_glb(file_field)
+    except ValueError as e:
+        raise ValidationError(str(e))
+
+
+def validate_glb_file(file_field):
+    """
+    Validates a GLB file using the Khronos Group's gltf-validator CLI.
+
+    Raises:
+        ValidationError: for file type errors or internal server errors.
+
+    Returns:
+        list: A list of error dictionaries if GLB validation fails. Each dictionary
+              contains 'message' and 'pointer' keys.
+        None: if the file is valid.
+    """
+
+    check_glb_file(file_field)
+
+    # staged uploads are hashed while they are received, see mainapp.uploadhandler
+    file_hash = getattr(file_field, "sha256", None)
+
+    if hasattr(file_field, "temporary_file_path"):
+        if file_hash is None:
+            file_hash = hash_chunks(file_field.chunks())
+        return validate_glb_path(file_field.temporary_file_path(), file_hash)
+
     with tempfile.NamedTemporaryFile(suffix=".glb") as temp_file:
+        sha256 = hashlib.sha256()
         for chunk in file_field.chunks():
             temp_file.write(chunk)
+            sha256.update(chunk)
         temp_file.flush()
 
-        try:
-            result = subprocess.run(
-                [settings.GLTF_VALIDATOR, temp_file.name, "-o"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-            )
-        except FileNotFoundError:
-            logger.exception(
-                f"gltf-validator CLI not found at {settings.GLTF_VALIDATOR}."
+        return validate_glb_path(temp_file.name, file_hash or sha256.hexdigest())
+
+
+def hash_chunks(chunks):
+    """
+    Returns the SHA-256 hash of the contents of a file, given as chunks.
+    """
+
+    sha256 = hashlib.sha256()
+    for chunk in chunks:
+        sha256.update(chunk)
+
+    return sha256.hexdigest()
+
+
+def validate_glb_path(path, file_hash=None):
+    """
+    Validates the GLB file at a path using the Khronos Group's gltf-validator,
+    reusing the report of a previous validation if the SHA-256 hash of the file
+    is given.
+
+    Raises:
+        ValidationError: for internal server errors, or if the model has no shape.
+
+    Returns:
+        list: A list of error dictionaries if GLB validation fails.
+        None: if the file is valid.
+    """
+
+    output = validation_report(path, file_hash)
+
+    try:
+        # Ensures the model has some shape. At least a cube.
+        if output["info"]["totalVertexCount"] < 3 or \
+            output["info"]["totalTriangleCount"] < 1:
+            raise ValidationError(
+                "GLB file must have some valid shape."
             )
-            raise ValidationError("Internal server error.")
 
-        try:
-            output = json.loads(result.stdout.decode("utf-8"))
-        except json.JSONDecodeError:
-            logger.exception("Validator returned invalid JSON output.")
-            raise ValidationError("Internal server error.")
+        if output["issues"]["numErrors"] > 0:
+            messages = []
+            for message in output["issues"]["messages"]:
+                if message["severity"] == 0:  # 0 is error in khronos validator
+                    messages.append({
+                        "message": message["message"],
+                        "pointer": message.get("pointer", "N/A")
+                    })
+            return messages
+    except KeyError:
+        logger.exception("Invalid gltf_validator output!\
+                        It seems gltf_validator's 'validation.schema.json' file has been modified.")
+        raise ValidationError("Internal server error.", code=INTERNAL_ERROR)
+
 
+def validation_report(path, file_hash=None):
+    """
+    Returns the validation report of the GLB file at a path, cached by the SHA-256
+    hash of the file if it is given, as validating the same bytes gives the same report.
+
+    Raises:
+        ValidationError: if the validator fails, or takes too long.
+    """
+
+    # looked up by name, as mainapp.models imports this module
+    ValidationReport = apps.get_model("mainapp", "ValidationReport")
+
+    if file_hash is not None:
+        cached = ValidationReport.objects.filter(file_hash=file_hash).first()
+        if cached is not None:
+            return cached.report
+
+    report = run_validator(path)
+
+    if file_hash is not None:
+        ValidationReport.objects.update_or_create(file_hash=file_hash, defaults={"report": report})
+
+    return report
+
+
+def run_validator(path):
+    """
+    Returns the validation report of the GLB file at a path, from the pool of
+    long-running validators if there is one, or from a new gltf-validator process.
+
+    Raises:
+        ValidationError: if the validator fails, or takes too long.
+    """
+
+    if settings.GLTF_VALIDATOR_SERVER:
+        pool = get_validator_pool(
+            settings.GLTF_VALIDATOR_SERVER,
+            settings.GLTF_VALIDATOR_POOL_SIZE,
+            settings.GLTF_VALIDATOR_TIMEOUT,
+        )
         try:
-            # Ensures the model has some shape. At least a cube.
-            if output["info"]["totalVertexCount"] < 3 or \
-                output["info"]["totalTriangleCount"] < 1:
-                raise ValidationError(
-                    "GLB file must have some valid shape."
-                )
-
-            if output["issues"]["numErrors"] > 0:
-                messages = []
-                for message in output["issues"]["messages"]:
-                    if message["severity"] == 0:  # 0 is error in khronos validator
-                        messages.append({
-                            "message": message["message"],
-                            "pointer": message.get("pointer", "N/A")
-                        })
-                return messages
-        except KeyError:
-            logger.exception("Invalid gltf_validator output!\
-                            It seems gltf_validator's 'validation.schema.json' file has been modified.")
-            raise ValidationError("Internal server error.")
+            return pool.validate(path)
+        except ValidatorBusy:
+            logger.error("No validator process became available.")
+            raise ValidationError("Internal server error.", code=INTERNAL_ERROR)
+        except ValidatorTimeout:
+            raise ValidationError("Validating the file took too long.")
+        except (OSError, ValueError):
+            logger.exception("The validator pool failed, validating with gltf-validator CLI instead.")
+
+    try:
+        result = subprocess.run(
+            [settings.GLTF_VALIDATOR, path, "-o"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=settings.GLTF_VALIDATOR_TIMEOUT,
+        )
+    except FileNotFoundError:
+        logger.exception(
+            f"gltf-validator CLI not found at {settings.GLTF_VALIDATOR}."
+        )
+        raise ValidationError("Internal server error.", code=INTERNAL_ERROR)
+    except subprocess.TimeoutExpired:
+        raise ValidationError("Validating the file took too long.")
+
+    try:
+        return json.loads(result.stdout.decode("utf-8"))
+    except json.JSONDecodeError:
+        logger.exception("Validator returned invalid JSON output.")
+        raise ValidationError("Internal server error.", code=INTERNAL_ERROR)
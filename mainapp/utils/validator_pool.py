@@ -0,0 +1,146 @@
+import os
+import json
+import time
+import queue
+import shlex
+import atexit
+import select
+import threading
+import subprocess
+
+class ValidatorTimeout(Exception):
+    """
+    Raised when a validator process takes too long to validate a file.
+    """
+
+
+class ValidatorBusy(Exception):
+    """
+    Raised when no validator process becomes available in time.
+    """
+
+
+class ValidatorProcess:
+    """
+    A long-running validator process, reading the path of a file on each line
+    of its input, and writing the validation report of each as a line of JSON.
+    """
+
+    def __init__(self, command):
+        self.process = subprocess.Popen(
+            shlex.split(command),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self.buffer = b""
+
+    def validate(self, path, timeout):
+        """
+        Returns the validation report of the file at a path.
+
+        Raises:
+            ValidatorTimeout: if the report isn't written within timeout seconds.
+            OSError: if the process exited.
+            ValueError: if the report is not valid JSON.
+        """
+
+        self.process.stdin.write(path.encode("utf-8") + b"\n")
+        self.process.stdin.flush()
+
+        report = json.loads(self.read_line(timeout))
+        if not isinstance(report, dict) or "error" in report:
+            raise ValueError(f"The validator failed to validate {path}: {report}")
+
+        return report
+
+    def read_line(self, timeout):
+        # read from the file descriptor, as the buffered reader hides data from select
+        deadline = time.monotonic() + timeout
+        descriptor = self.process.stdout.fileno()
+
+        while b"\n" not in self.buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([descriptor], [], [], remaining)[0]:
+                raise ValidatorTimeout()
+
+            chunk = os.read(descriptor, 64 * 1024)
+            if not chunk:
+                raise OSError("The validator process exited.")
+            self.buffer += chunk
+
+        line, _, self.buffer = self.buffer.partition(b"\n")
+        return line
+
+    def close(self):
+        self.process.kill()
+        self.process.wait()
+
+
+class ValidatorPool:
+    """
+    A pool of up to size validator processes, started when needed and kept
+    running between validations, so each file doesn't pay for starting one.
+    Validations wait for a process to be available.
+    """
+
+    def __init__(self, command, size, timeout):
+        self.command = command
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(size)
+        self.idle = queue.LifoQueue()
+
+    def validate(self, path):
+        """
+        Returns the validation report of the file at a path.
+
+        Raises:
+            ValidatorBusy: if no process becomes available within the timeout of the pool.
+            ValidatorTimeout: if the validation takes longer than the timeout of the pool.
+            OSError, ValueError: if a process failed. It is replaced by the next validation.
+        """
+
+        if not self.slots.acquire(timeout=self.timeout):
+            raise ValidatorBusy()
+
+        try:
+            try:
+                process = self.idle.get_nowait()
+            except queue.Empty:
+                process = ValidatorProcess(self.command)
+
+            try:
+                report = process.validate(path, self.timeout)
+            except BaseException:
+                # the state of the process is unknown
+                process.close()
+                raise
+
+            self.idle.put(process)
+            return report
+        finally:
+            self.slots.release()
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+def get_validator_pool(command, size, timeout):
+    """
+    Returns the pool of this process for a validator command, making it on first use.
+    """
+
+    key = (command, size, timeout)
+    with pools_lock:
+        if key not in pools:
+            pools[key] = ValidatorPool(command, size, timeout)
+            atexit.register(pools[key].close)
+        return pools[key]
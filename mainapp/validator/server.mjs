@@ -0,0 +1,24 @@
+// A long-running glTF validator, see GLTF_VALIDATOR_SERVER_COMMAND in the settings.
+// It reads the path of a GLB file on each line of its input, and writes the
+// validation report of each file as a line of JSON, in the format of the
+// reports of the gltf_validator command line tool.
+import { readFile } from "node:fs/promises";
+import { createInterface } from "node:readline";
+import validator from "gltf-validator";
+
+const lines = createInterface({ input: process.stdin, terminal: false });
+
+for await (const path of lines) {
+    let report;
+    try {
+        const data = await readFile(path);
+        report = await validator.validateBytes(new Uint8Array(data), {
+            uri: path,
+            // uploads are single GLB files, without external resources
+            externalResourceFunction: (uri) => Promise.reject(new Error(`External resource ${uri} is not supported.`)),
+        });
+    } catch (error) {
+        report = { error: String(error) };
+    }
+    process.stdout.write(JSON.stringify(report) + "\n");
+}
@@ -11,7 +11,7 @@ from django.contrib import messages
 from django.db import transaction
 from .models import Model, Category, Change, Ban, Location
 from .forms import UploadFileForm, UploadFileMetadataForm, MetadataForm, UserDescriptionForm
-from .utils import get_kv, update_last_page, get_last_page, CHANGES, admin, LICENSES_DISPLAY
+from .utils import get_kv, update_last_page, get_last_page, CHANGES, admin, LICENSES_DISPLAY, text_filter
 import mainapp.database as database
 from mainapp.markdown import markdown
 
@@ -73,6 +73,47 @@ def downloads(request):
 
     return render(request, 'mainapp/downloads.html')
 
+# returns the stats of a model revision shown on its Stats tab, with the text class of each,
+# like model_stats.js does in the browser for the files being uploaded
+def stats_display(stats):
+    if stats is None:
+        return None
+
+    def quality(good, warning):
+        return 'text-success' if good else 'text-warning' if warning else 'text-danger'
+
+    faces = stats['faces']
+    display = {
+        'faces': '{:,}'.format(faces),
+        'faces_class': quality(faces <= 5000, faces <= 100000),
+        'meshes': '{:,}'.format(stats['meshes']),
+        'meshes_class': quality(stats['meshes'] >= 1, False),
+        'materials': stats['materials'],
+        # unknown for models without positions, or whose nodes couldn't be walked
+        'density': None,
+        'density_class': 'text-muted',
+        'bounding_box': None,
+        'bounding_box_class': 'text-muted',
+        'textures': stats['textures'],
+        'textures_class': quality(stats['textures'] > 0, True),
+        'pbr_textures': stats['pbr_textures'],
+        'pbr_textures_class': quality(stats['pbr_textures'] > 0, True),
+        'animations': stats['animations'] > 0,
+        'size': stats['size'],
+    }
+
+    if stats['bounding_box']:
+        width, height, depth = stats['bounding_box']
+        volume = width * height * depth
+        density = faces / (volume or 1)
+
+        display['density'] = '{:,.2f}'.format(density)
+        display['density_class'] = quality(0 < density <= 500, density <= 1000)
+        display['bounding_box'] = '{:.2f}m × {:.2f}m × {:.2f}m'.format(width, height, depth)
+        display['bounding_box_class'] = quality(volume > 0.01, volume > 0.001)
+
+    return display
+
 def model(request, model_id, revision=None):
     update_last_page(request)
 
@@ -90,7 +131,8 @@ def model(request, model_id, revision=None):
     context = {
         'model': model,
         'latest_page': revision is None,
-        'license': LICENSES_DISPLAY[model.license]
+        'license': LICENSES_DISPLAY[model.license],
+        'model_stats': stats_display(model.stats),
     }
 
     return render(request, 'mainapp/model.html', context)
@@ -118,6 +160,7 @@ def search(request):
         url_params += 'category=' + category
 
     models = Model.objects.filter(latest=True)
+    ordering = ['-pk']
 
     if tag:
         try:
@@ -128,15 +171,14 @@ def search(request):
     elif category:
         filtered_models = models.filter(categories__name=category)
     elif query:
-        filtered_models = \
-            models.filter(title__icontains=query) | \
-            models.filter(description__icontains=query)
+        filtered_models = text_filter(models, query)
+        ordering = ['-rank', '-pk']
 
     try:
         if not admin(request):
             filtered_models = filtered_models.filter(is_hidden=False)
 
-        ordered_models = filtered_models.order_by('-pk')
+        ordered_models = filtered_models.order_by(*ordering)
     except UnboundLocalError:
         # filtered_models isn't set, redirect to homepage
         return redirect(index)
@@ -236,7 +278,7 @@ def revise(request, model_id):
         messages.error(request, 'You are banned. Revising models is not permitted.')
         return redirect(index)
 
-    m = Model.objects.get(model_id=model_id, latest=True)
+    m = get_object_or_404(Model, model_id=model_id, latest=True)
 
     if request.method == 'POST':
         form = UploadFileForm(request.POST, request.FILES)
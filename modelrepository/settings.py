@@ -169,11 +169,99 @@ DJANGO_VITE_DEV_MODE = DEBUG
 
 MODEL_DIR = os.environ.get('MODEL_DIR', BASE_DIR / "models")
 
+# Where model files are stored:
+# 'filesystem' keeps them in MODEL_DIR,
+# 's3' keeps them in a bucket of an S3-compatible object store (AWS S3, MinIO, ...),
+# which needs django-storages[s3]. MODEL_DIR then only holds the files being processed.
+MODEL_STORAGE = os.environ.get('MODEL_STORAGE', 'filesystem')
+
+if MODEL_STORAGE == 's3':
+    MODEL_STORAGE_BACKEND = {
+        'BACKEND': 'storages.backends.s3.S3Storage',
+        'OPTIONS': {
+            'bucket_name': os.environ.get('MODEL_S3_BUCKET'),
+            'endpoint_url': os.environ.get('MODEL_S3_ENDPOINT_URL') or None,
+            'region_name': os.environ.get('MODEL_S3_REGION') or None,
+            'access_key': os.environ.get('MODEL_S3_ACCESS_KEY_ID'),
+            'secret_key': os.environ.get('MODEL_S3_SECRET_ACCESS_KEY'),
+            # how long the presigned URLs that clients are redirected to are valid, in seconds
+            'querystring_expire': int(os.environ.get('MODEL_S3_URL_EXPIRY', 3600)),
+            'file_overwrite': True,
+        },
+    }
+else:
+    MODEL_STORAGE_BACKEND = {
+        'BACKEND': 'mainapp.storage.ModelFileSystemStorage',
+    }
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+    'models': MODEL_STORAGE_BACKEND,
+}
+
+# How model files are sent to clients:
+# 'django' streams them from the application,
+# 'x-accel-redirect' leaves sending them to nginx, from MODEL_ACCEL_REDIRECT_LOCATION,
+# 'x-sendfile' leaves sending them to a proxy supporting the X-Sendfile header (Apache, lighttpd),
+# 'redirect' redirects clients to the URL of the file in the storage, presigned for object stores.
+# The proxies need the 'filesystem' storage.
+MODEL_SERVING = os.environ.get('MODEL_SERVING', 'django')
+MODEL_ACCEL_REDIRECT_LOCATION = os.environ.get('MODEL_ACCEL_REDIRECT_LOCATION', '/protected/models')
+
 GLTF_VALIDATOR = os.environ.get(
     'GLTF_VALIDATOR_PATH',
     'gltf_validator' # assume global installation in $PATH
 )
+# The command line of a long-running validator, reading the path of a GLB file on each
+# line of its input, and writing the validation report of each as a line of JSON, e.g.
+# node mainapp/validator/server.mjs
+# Each application process keeps up to GLTF_VALIDATOR_POOL_SIZE of them running.
+# Files are validated by a new GLTF_VALIDATOR process each when it is empty, or fails.
+GLTF_VALIDATOR_SERVER = os.environ.get('GLTF_VALIDATOR_SERVER_COMMAND', '')
+GLTF_VALIDATOR_POOL_SIZE = int(os.environ.get('GLTF_VALIDATOR_POOL_SIZE', 2))
+GLTF_VALIDATOR_TIMEOUT = int(os.environ.get('GLTF_VALIDATOR_TIMEOUT', 60)) # in seconds
+
+# The command line of a tool writing an optimized variant of each model revision,
+# with {input} and {output} replaced by the paths of the model and of the variant, e.g.
+# gltf-transform optimize {input} {output} --compress meshopt --texture-size 1024 --simplify false
+# No optimized variants are made when it is empty.
+MODEL_OPTIMIZER = os.environ.get('MODEL_OPTIMIZER_COMMAND', '')
+# The command line of a tool writing a simplified level of detail of each model revision,
+# with {input}, {output} and {ratio}, the fraction of the triangles to keep, replaced, e.g.
+# gltf-transform simplify {input} {output} --ratio {ratio} --error 0.01
+# A level of detail is made for each ratio of MODEL_LOD_RATIOS, from the most detailed.
+MODEL_SIMPLIFIER = os.environ.get('MODEL_SIMPLIFIER_COMMAND', '')
+MODEL_LOD_RATIOS = [
+    float(ratio) for ratio in os.environ.get('MODEL_LOD_RATIOS', '0.5,0.1,0.01').split(',') if ratio
+]
+# The command line of a tool rendering a PNG thumbnail of each model revision,
+# with {input} and {output} replaced by the paths of the model and of the thumbnail, e.g.
+# screenshot-glb -i {input} -o {output} --width 512 --height 384
+# The listings show the live viewer of models without thumbnails.
+MODEL_THUMBNAILER = os.environ.get('MODEL_THUMBNAILER_COMMAND', '')
+MODEL_PROCESSING_TIMEOUT = int(os.environ.get('MODEL_PROCESSING_TIMEOUT', 300)) # in seconds
+
+# How uploads are validated and processed:
+# 'sync' does it during the upload request,
+# 'async' stores them as pending, and leaves them to the workers of the ingest_worker command
+MODEL_INGEST = os.environ.get('MODEL_INGEST', 'sync')
+INGEST_WORKERS = int(os.environ.get('INGEST_WORKERS', 2))
+INGEST_POLL_INTERVAL = float(os.environ.get('INGEST_POLL_INTERVAL', 2)) # in seconds
+# how long a worker holds a job before it is taken again, as it's assumed the worker died
+INGEST_LEASE = int(os.environ.get('INGEST_LEASE', 3600)) # in seconds
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 MAX_MODEL_SIZE = int(os.environ.get('MAX_MODEL_SIZE', 10 * 1024 * 1024))
+
+# Uploaded model files are written straight to the staging directory of the model storage
+FILE_UPLOAD_HANDLERS = [
+    'mainapp.uploadhandler.StagingFileUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]